@@ -1,601 +1,339 @@
+import logging
 import os
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import matplotlib.image as mpimg
-from mplsoccer import Pitch, VerticalPitch
-from highlight_text import ax_text
-import numpy as np
-from adjustText import adjust_text
-from scipy.stats import percentileofscore, rankdata
+from instrumentacao import etapa, marcar, medir_rerun, resumo_perfil
+
+# Uma linha JSON por rerun (instrumentacao.py) vai para o log do servidor
+logging.basicConfig(level=os.environ.get("DATAFUTEBOL_LOG", "INFO"),
+                    format="%(asctime)s %(name)s %(message)s")
 
 # ===========================
 # CARREGAR DADOS (lazy load)
 # ===========================
+def ler_base(fonte, colunas):
+    # Só a temporada escolhida e só as colunas que a visão precisa. Sem
+    # st.cache_data de propósito: quem chama guarda só o que deriva daqui
+    # (o cache_data guardaria mais uma cópia e devolveria outra a cada rerun)
+    with etapa("parquet"):
+        return ler_eventos(fonte, colunas)
+
+
 @st.cache_data
-def carregar_dados():
-    arquivo = "BRA25.parquet"
-    if os.path.exists(arquivo):
-        return pd.read_parquet(arquivo)
-    else:
-        st.error("Arquivo BRA25.parquet não encontrado no repositório!")
-        return pd.DataFrame()  # retorna vazio se não achar
+def carregar_times():
+    return ler_times()
+
+
+@st.cache_data(max_entries=8)
+def carregar_partidas(fonte, versao):
+    # Confrontos da temporada (matchId -> "Casa x Fora"), ordenados pelo
+    # nome; montados uma vez por versão dos dados em vez de a cada clique
+    df = ler_base(fonte, COLUNAS_PARTIDAS)
+    with etapa("confronto"):
+        partidas = df.drop_duplicates().reset_index(drop=True)
+        partidas["confronto"] = partidas["home"].astype(str) + " x " + partidas["away"].astype(str)
+        partidas = partidas.sort_values("confronto", kind="stable")
+    return dict(zip(partidas["matchId"].tolist(), partidas["confronto"]))
+
+
+@st.cache_data(max_entries=8)
+def carregar_cubo(fonte, versao):
+    # Cubo jogador x partida: o guardado pela ingestão incremental ou,
+    # sem ele, montado uma vez por versão dos dados
+    with etapa("cubo"):
+        cubo = ler_cubo(fonte)
+        if cubo is None:
+            eventos = ler_base(fonte, COLUNAS_STATS)
+            with etapa("xT"):
+                anexar_xt(eventos)
+            cubo = construir_cubo(eventos)
+    return cubo
+
+
+@st.cache_data(max_entries=32)
+def carregar_rankings(fonte, versao, match_id=None, modo="Total"):
+    # Tabela completa dos Rankings por filtro de partida e modo; ordenação e
+    # paginação são feitas em cima dela a cada rerun (top_n)
+    cubo = carregar_cubo(fonte, versao)
+    with etapa("agregação"):
+        return tabela_rankings(agregar_jogadores(cubo, team_mapping, match_id), modo)
+
+
+@st.cache_data(max_entries=32)
+def carregar_percentis(fonte, versao, match_id=None):
+    # Médias por jogo e matriz de percentis (jogadores x ESTATISTICAS_RADAR)
+    # por filtro de partida; reaproveitável por qualquer visão
+    cubo = carregar_cubo(fonte, versao)
+    with etapa("agregação"):
+        stats_per_game = por_jogo(agregar_jogadores(cubo, team_mapping, match_id))
+        return stats_per_game, matriz_percentis(stats_per_game)
+
+
+@st.cache_resource(max_entries=8)
+def carregar_semelhantes(fonte, versao, match_id=None):
+    # KD-tree dos jogadores (médias por jogo padronizadas), uma por
+    # versão/partida e compartilhada por todas as sessões
+    stats_per_game, _ = carregar_percentis(fonte, versao, match_id)
+    with etapa("kd-tree"):
+        return indexar_semelhantes(stats_per_game)
+
+
+@st.cache_resource(max_entries=4)
+def carregar_indice(fonte, versao):
+    # Base das Visualizações: lida, ordenada e indexada uma vez por versão e
+    # compartilhada por todas as sessões. Nunca é alterada depois daqui:
+    # filtros devolvem fatias (views) dela.
+    # Com DATAFUTEBOL_ESPELHO, vem do arquivo Arrow mapeado em memória,
+    # o mesmo para todos os processos do servidor (dados.ler_indice)
+    with etapa("índice"):
+        return ler_indice(fonte, team_mapping, versao)
+
+
+@st.cache_data(max_entries=64)
+def opcoes_times(fonte, versao, match_id=None):
+    _, limites = carregar_indice(fonte, versao)
+    if match_id is not None:
+        limites = limites[limites["matchId"] == match_id]
+    return sorted(limites["teamId"].map(team_mapping).dropna().unique())
+
+
+@st.cache_data(max_entries=256)
+def opcoes_jogadores(fonte, versao, team_id, match_id=None):
+    _, limites = carregar_indice(fonte, versao)
+    limites = limites[limites["teamId"] == team_id]
+    if match_id is not None:
+        limites = limites[limites["matchId"] == match_id]
+    return sorted(limites["playerName"].dropna().unique())
+
+
+@st.cache_resource(max_entries=64)
+def filtrar(fonte, versao, team_id, player_name=None, match_id=None):
+    # Eventos do filtro: fatia sem cópia da base quando os intervalos são
+    # contíguos (time ou jogador em "Todos"), senão só as linhas do filtro
+    eventos, limites = carregar_indice(fonte, versao)
+    with etapa("filtro"):
+        return fatiar(eventos, limites, team_id, player_name, match_id)
+
+
+@st.cache_resource(max_entries=4)
+def carregar_grades(fonte, versao):
+    # Toques por jogador x partida em grade fixa; só leitura, compartilhado
+    with etapa("grades"):
+        grades = ler_grades(fonte)
+        if grades is None:
+            grades = construir_grades(ler_base(fonte, COLUNAS_TOQUES))
+    return grades
+
+
+@st.cache_resource(max_entries=4)
+def carregar_zonas(fonte, versao):
+    # Contagens por jogador x partida x categoria x zona, montadas uma vez a
+    # partir da base das Visualizações; só leitura, compartilhado
+    eventos, _ = carregar_indice(fonte, versao)
+    with etapa("zonas"):
+        return construir_zonas(eventos)
+
+
+@st.cache_data(max_entries=64)
+def carregar_rede(fonte, versao, match_id, team_name):
+    # Rede de passes do time inteiro na partida (ou temporada): a mesma para
+    # o time e para cada jogador dele, que só aparece destacado
+    eventos = filtrar(fonte, versao, team_ids[team_name], match_id=match_id)
+    with etapa("rede de passes"):
+        return rede_de_passes(eventos)
+
+
+@st.cache_resource
+def carregar_assets(team_names):
+    # Logos e fontes decodificados uma vez por processo, na primeira visita
+    # às Visualizações; o que faltar vai para o log (e para o painel de depuração)
+    return verificar_assets(team_names)
+
+
+@st.cache_resource
+def cache_figuras():
+    # Um cache de PNGs por processo, compartilhado por todas as sessões
+    return CacheFiguras(pasta=os.environ.get("DATAFUTEBOL_CACHE_FIGURAS"))
 
 
-# ===========================
-# APP
-# ===========================
-st.sidebar.title("Menu")
-menu_option = st.sidebar.radio(
-    "Navegação",
-    ["Visualizações", "Rankings", "Comparação", "Contato"],
-    key="menu_option"
-)
-st.subheader("👋 Seja bem-vindo ao aplicativo do DataFutebol")
-st.markdown("Nos siga nas Redes Sociais → **@DataFutebol** | Apoie o projeto! Chave Pix-> iolncant@gmail.com")
-
-# 🔑 Só carrega os dados quando precisar
-if menu_option in ["Visualizações", "Rankings", "Comparação"]:
-    df = carregar_dados()
-
-    if df.empty:
-        st.stop()  # encerra se não achou os dados
-team_mapping = {
-    1239: "Flamengo",
-    1234: "Palmeiras",
-    1221: "Bahia",
-    1219: "Internacional",
-    1230: "Cruzeiro",
-    1227: "Botafogo",
-    1232: "Fluminense",
-    1226: "Vasco",
-    1237: "Corinthians",
-    1224: "São Paulo",
-    1241: "Santos",
-    5438: "Red Bull Bragantino",
-    1235: "Atlético Mineiro",
-    2065: "Fortaleza",
-    1231: "Sport",
-    1238: "Vitória",
-    1244: "Grêmio",
-    7334: "Ceará",
-    1220: "Juventude",
-    6332: "Mirassol",
-}
-
-# Substituir os IDs pelos nomes
-df["teamName"] = df["teamId"].map(team_mapping)
-
-data = df
+@st.cache_resource
+def pool_painel():
+    # Pool do modo Painel, criado no primeiro uso e compartilhado
+    return criar_pool()
 
-# ===========================
-# FILTRO POR PARTIDA (CONFRONTO)
-# ===========================
-st.sidebar.subheader("Filtrar por Partida")
-# Criar coluna de confronto se ainda não existir
-if 'confronto' not in df.columns:
-    df['confronto'] = df['home'] + " x " + df['away']
-
-# Lista de confrontos
-confrontos = df[['matchId', 'confronto']].drop_duplicates()
-confrontos_sorted = confrontos.sort_values('confronto')
-confronto_options = ["Todos"] + confrontos_sorted['confronto'].tolist()
-selected_confronto = st.sidebar.selectbox("Escolha a partida:", confronto_options)
-
-# Filtrar o dataframe
-if selected_confronto != "Todos":
-    match_id = confrontos_sorted[confrontos_sorted['confronto'] == selected_confronto]['matchId'].iloc[0]
-    df_filtered = df[df['matchId'] == match_id]
-else:
-    df_filtered = df.copy()
-
-plot_types = [
-    "Passes para o Terço Final",
-    "Ações Defensivas",
-    "Escanteios",
-    "Dribles Completos",
-    "Passes Progressivos",
-    "Passes Certos e Errados",
-    "Chances Criadas",
-    "Ações Defensivas no Ataque",
-    "Finalizações",
-    "Mapa de Calor",
-    "Passes para a Área"
-]
-
-# Fonte
-fnt = fm.FontProperties(fname='BigShoulders_18pt-Regular.ttf')
-
-def add_logo(fig, team_name):
-    try:
-        logo = mpimg.imread(f"{team_name}.png")
-        ax_img = fig.add_axes([0.12, 0.93, 0.1, 0.1])
-        ax_img.imshow(logo)
-        ax_img.axis("off")
-    except:
-        pass
 
 # ======================================================
-# FUNÇÕES DE PLOTAGEM
+# VISUALIZAÇÕES (funções de plotagem em plots.py)
 # ======================================================
 
-def plot_passes_final(data, selected):
-    pitch = Pitch(pitch_type='opta', line_color='dimgray', pitch_color='#f7f7f7')
-    fig, ax = pitch.draw(figsize=(16, 11))
-    fig.set_facecolor('#f7f7f7')
-
-    passes = data[(data['type'] == 'Pass') & (data['outcomeType'] == 'Successful')]
-    terco_final = passes[passes['last_third_entry'] == True]
-    outros_passes = passes[passes['last_third_entry'] == False]
-
-    pitch.lines(terco_final.x, terco_final.y, terco_final.endX, terco_final.endY,
-                comet=True, color="seagreen", lw=4, ax=ax, linestyle="--")
-    ax.scatter(terco_final.endX, terco_final.endY, s=120, c="seagreen", edgecolors="black")
-
-    pitch.lines(outros_passes.x, outros_passes.y, outros_passes.endX, outros_passes.endY,
-                comet=True, color="gray", lw=4, ax=ax, alpha=0.3, linestyle="--")
-    ax.scatter(outros_passes.endX, outros_passes.endY, s=100, c="gray", edgecolors="black", alpha=0.3)
-
-    v1, v2 = len(outros_passes), len(terco_final)
-    ax.set_title(f"Passes para o Terço Final - {selected}", fontproperties=fnt, fontsize=30)
-    ax_text(50, 102, s=f'<Total: {v1}> | <Terço Final: {v2}> | viz by @DataFutebol',
-            highlight_textprops=[{"color": "black"}, {"color": "seagreen"}],
-            ax=ax, fontproperties=fnt, ha='center', va='center', fontsize=15, color="dimgray")
-
-    add_logo(fig, data['teamName'].iloc[0])
-    return fig
-
-def plot_boxpass(data, selected):
-    pitch = Pitch(pitch_type='opta', line_color='dimgray',
-                          pitch_color='#f7f7f7')
-    fig, ax = pitch.draw(figsize=(16, 11))
-    fig.set_facecolor('#f7f7f7')
-
-    passes_box = data[(data['type'] == 'Pass') & (data['outcomeType'] == 'Successful') & (data['passFreekick'])]
-    box = passes_box[passes_box['box_entry'] == True]
-
-    pitch.lines(box.x, box.y, box.endX, box.endY,
-                comet=True, color="green", lw=4, ax=ax)
-    ax.scatter(box.endX, box.endY, s=120, c="green",  edgecolors="black")
-
-    box_count = len(box)
-    ax.set_title(f"Passes para a Área - {selected}", fontproperties=fnt, fontsize=30)
-    ax_text(50, 102, s=f'<Total: {box_count}> | viz by @DataFutebol',
-            highlight_textprops=[{"color": "green"}],
-            ax=ax, fontproperties=fnt, ha='center', va='center', fontsize=15, color="dimgray")
-
-    add_logo(fig, data['teamName'].iloc[0])
-    return fig
-
-def plot_defensivas(data, selected):
-    pitch = Pitch(pitch_type='opta', line_color='dimgray', pitch_color='#f7f7f7')
-    fig, ax = pitch.draw(figsize=(16, 11))
-    fig.set_facecolor('#f7f7f7')
-
-    tackle = data[data['type'] == 'Tackle']
-    interception = data[data['type'] == 'Interception']
-    clearance = data[data['type'] == 'Clearance']
-    ball_recovery = data[data['type'] == 'BallRecovery']
-    foul = data[data['type'] == 'Foul']
-
-    pitch.scatter(tackle.x, tackle.y, s=200, c="royalblue", edgecolors="black", ax=ax)
-    pitch.scatter(interception.x, interception.y, s=200, c="orange", edgecolors="black", marker='s', ax=ax)
-    pitch.scatter(clearance.x, clearance.y, s=200, c="purple", edgecolors="black", marker='H', ax=ax)
-    pitch.scatter(ball_recovery.x, ball_recovery.y, s=200, c="green", edgecolors="black", marker='D', ax=ax)
-    pitch.scatter(foul.x, foul.y, s=200, c="red", edgecolors="black", marker='X', ax=ax)
-
-    tk, it, cl, br, fo = len(tackle), len(interception), len(clearance), len(ball_recovery), len(foul)
-
-    ax.set_title(f"Ações Defensivas - {selected}", fontproperties=fnt, fontsize=30)
-    ax_text(50, 102, s=f'<Desarmes: {tk}> | <Interceptações: {it}> | <Bolas Recuperadas: {br}> | '
-                       f'<Rebatidas: {cl}> | <Faltas: {fo}> | viz by @DataFutebol',
-            highlight_textprops=[{"color": "royalblue"}, {"color": "orange"},
-                                 {"color": "green"}, {"color": "purple"}, {"color": "red"}],
-            ax=ax, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
-
-    add_logo(fig, data['teamName'].iloc[0])
-    return fig
-
-
-def plot_escanteios(data, selected):
-    pitch = Pitch(pitch_type="opta", line_color="dimgray", pitch_color="#f7f7f7")
-    fig, ax = pitch.draw(figsize=(16, 11))
-    fig.set_facecolor("#f7f7f7")
-
-    complete_pass = data[data['passCornerAccurate'] == True]
-    incomplete_pass = data[data['passCornerInaccurate'] == True]
-
-    pitch.lines(incomplete_pass.x, incomplete_pass.y, incomplete_pass.endX, incomplete_pass.endY,
-                lw=5, comet=True, color='purple', ax=ax, alpha=0.2)
-    pitch.scatter(incomplete_pass.endX, incomplete_pass.endY, color='none',
-                  s=300, edgecolors='purple', ax=ax, marker='X')
-
-    pitch.lines(complete_pass.x, complete_pass.y, complete_pass.endX, complete_pass.endY,
-                lw=5, comet=True, color='green', ax=ax, alpha=0.2)
-    pitch.scatter(complete_pass.endX, complete_pass.endY, color='green',
-                  s=300, edgecolors='black', ax=ax)
-
-    v1 = len(complete_pass)
-    v2 = 100 * (len(complete_pass) / (len(complete_pass) + len(incomplete_pass))) if len(complete_pass)+len(incomplete_pass) > 0 else 0
-
-    ax.set_title(f"Escanteios - {selected}", fontproperties=fnt, fontsize=30)
-    ax_text(50, 102, s=f'<Escanteios Certos: {v1}> | <Aproveitamento: {v2:.2f}%> | viz by @DataFutebol',
-            highlight_textprops=[{"color": "green"}, {"color": "black"}],
-            ax=ax, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
-
-    add_logo(fig, data['teamName'].iloc[0])
-    return fig
-
-def plot_dribles(data, selected):
-    pitch = Pitch(pitch_type="opta", line_color="dimgray", pitch_color="#f7f7f7")
-    fig, ax = pitch.draw(figsize=(16, 11))
-    fig.set_facecolor("#f7f7f7")
-
-    drib = data[data["dribbleWon"] == True]
-    dribe = data[data["dribbleLost"] == True]
-    pitch.scatter(drib.x, drib.y, s=200, c="darkgreen", marker="^", ax=ax, edgecolors="black")
-    pitch.scatter(dribe.x, dribe.y, s=200, c="red", marker="^", ax=ax, edgecolors="black")
-
-    v1 = len(drib)
-    v2 = 100*(len(drib)/(len(drib) + len(dribe)))
-    ax.set_title(f"Dribles Completos - {selected}", fontproperties=fnt, fontsize=30)
-    ax_text(50, 102, s=f'<Dribles Completos: {v1}> | <Aproveitamento: {v2:.2f}%> | viz by @DataFutebol',
-        highlight_textprops=[{"color": "green"}, {"color":"black"}],
-        ax=ax, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
-
-    add_logo(fig, data['teamName'].iloc[0])
-    return fig
-
-def plot_passes_progressivos(data, selected):
-    pitch = Pitch(pitch_type="opta", line_color="dimgray", pitch_color="#f7f7f7")
-    fig, ax = pitch.draw(figsize=(16, 11))
-    fig.set_facecolor("#f7f7f7")
-
-    passes = data[(data["type"] == "Pass") & (data["progressive_action"] == True) & (data['passFreekick'] == False)]
-    p = data[(data["type"] == "Pass") & (data["progressive_action"] == False)]
-    pitch.lines(passes.x, passes.y, passes.endX, passes.endY,
-                comet=True, color="blue", lw=3, ax=ax)
-    pitch.scatter(passes.endX, passes.endY, s=200, c="blue", marker="o", ax=ax, edgecolors="black")
-    pitch.lines(p.x, p.y, p.endX, p.endY,
-                comet=True, color="gray", lw=3, alpha = 0.3, ax=ax)
-    pitch.scatter(p.endX, p.endY, s=100, c="gray", marker="o", alpha = 0.3, ax=ax, edgecolors="black")
-
-    ax.set_title(f"Passes Progressivos - {selected}", fontproperties=fnt, fontsize=30)
-    ax_text(50, 102, s=f'<Total: {len(passes)}> | viz by @DataFutebol',
-            highlight_textprops=[{"color": "black"}], ax=ax, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
-
-    add_logo(fig, data['teamName'].iloc[0])
-    return fig
-
-def plot_passes_certos_errados(data, selected):
-    pitch = Pitch(pitch_type="opta", line_color="dimgray", pitch_color="#f7f7f7")
-    fig, ax = pitch.draw(figsize=(16, 11))
-    fig.set_facecolor("#f7f7f7")
-
-    passes = data[(data["type"] == "Pass") & (data['passFreekick'] == False)]
-    certos = passes[passes["outcomeType"] == "Successful"]
-    errados = passes[passes["outcomeType"] == "Unsuccessful"]
-
-    pitch.lines(certos.x, certos.y, certos.endX, certos.endY,
-                comet=True, color="royalblue", lw=3, ax=ax)
-    pitch.scatter(certos.endX, certos.endY,
-                  color='royalblue', s=300, edgecolors='black', ax=ax)
-    pitch.lines(errados.x, errados.y, errados.endX, errados.endY,
-                comet=True, color="red", lw=2, ax=ax, alpha=0.7)
-    pitch.scatter(errados.endX, errados.endY,
-                  color='red', s=300, edgecolors='black', ax=ax, alpha = 0.7)
-
-    ax.set_title(f"Passes Certos e Errados - {selected}", fontproperties=fnt, fontsize=30)
-    ax_text(50, 102, s=f'<Certos: {len(certos)}> | <Errados: {len(errados)}> | viz by @DataFutebol', highlight_textprops=[{"color": "royalblue"}, {"color": "red"}],
-        ax=ax, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
-
-    add_logo(fig, data['teamName'].iloc[0])
-    return fig
-
-def plot_chances(data, selected):
-    pitch = Pitch(pitch_type="opta", line_color="dimgray", pitch_color="#f7f7f7")
-    fig, ax = pitch.draw(figsize=(16, 11))
-    fig.set_facecolor("#f7f7f7")
-
-    chances = data[(data["passKey"] == True) & (data['assist'] == False)]
-    pitch.lines(chances.x, chances.y, chances.endX, chances.endY,
-                comet=True, color="blue", lw=3, ax=ax)
-    pitch.scatter(chances.endX, chances.endY, s=100, c="blue", marker ='s', edgecolors="black", ax=ax)
-    assists = data[data['assist'] == True]
-    pitch.lines(assists.x, assists.y, assists.endX, assists.endY,
-                comet=True, color="gold", lw=3, ax=ax)
-    pitch.scatter(assists.endX, assists.endY, s=400, c="gold", marker ='*', edgecolors="black", ax=ax)
-
-
-    ax.set_title(f"Chances Criadas - {selected}", fontproperties=fnt, fontsize=30)
-    ax_text(50, 102, s=f'<Chances Criadas: {len(chances)}> | <Assistências> | viz by @DataFutebol', highlight_textprops=[{"color": "blue"}, {"color": "gold"}],
-        ax=ax, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
-
-    add_logo(fig, data['teamName'].iloc[0])
-    return fig
-
-def plot_defensivas_ataque(data, selected):
-    pitch = VerticalPitch(pitch_type="opta", line_color="dimgray", pitch_color="#f7f7f7", half = True)
-    fig, ax = pitch.draw(figsize=(16, 11))
-    fig.set_facecolor("#f7f7f7")
-    at = data[data['x'] > 50]
-    tacklea = at[at['type'] == 'Tackle']
-    interceptiona = at[at['type'] == 'Interception']
-    ball_recoverya = at[at['type'] == 'BallRecovery']
-    foula = at[at['type'] == 'Foul']
-    pitch.scatter(tacklea.x, tacklea.y, s=200, c="royalblue", edgecolors="black", ax=ax)
-    pitch.scatter(interceptiona.x, interceptiona.y, s=200, c="orange", edgecolors="black", marker = 's', ax=ax)
-    pitch.scatter(ball_recoverya.x, ball_recoverya.y, s=200, c="green", edgecolors="black", marker = 'D', ax=ax)
-    pitch.scatter(foula.x, foula.y, s=200, c="red", edgecolors="black", marker = 'X', ax=ax)
-    tka = len(tacklea)
-    ita = len(interceptiona)
-    bra = len(ball_recoverya)
-    foa = len(foula)
-
-    ax.set_title(f"Ações Defensivas no Campo de Ataque - {selected}", fontproperties=fnt, fontsize=30)
-    ax_text(50, 102, s=f'<Desarmes: {tka}> | <Interceptações: {ita}> | <Bolas Recuperadas: {bra}> | <Faltas: {foa}> | viz by @DataFutebol',
-        highlight_textprops=[{"color": "royalblue"}, {"color": "orange"}, {"color":"green"}, {"color":"red"}],
-        ax=ax, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
-
-    add_logo(fig, data['teamName'].iloc[0])
-    return fig
-
-def plot_finalizacoes(data, selected):
-    pitch = VerticalPitch(pitch_type="opta", line_color="dimgray", pitch_color="#f7f7f7", half = True)
-    fig, ax = pitch.draw(figsize=(16, 11))
-    fig.set_facecolor("#f7f7f7")
-
-    goals = data[data['isGoal'] == True]
-    off_target = data[data['shotOffTarget'] == True]
-    trave = data[data['shotOnPost'] == True]
-    on_target = data[(data['shotOnTarget'] == True) & (data['isGoal'] == False)]
-    pitch.scatter(off_target.x, off_target.y,
-                  c="red", s=300, marker="X", ax=ax)
-    pitch.scatter(trave.x, trave.y,
-                  c="blue", s=250, marker="^", ax=ax)
-    pitch.scatter(on_target.x, on_target.y,
-                  c="green", s=350, marker="o", ax=ax)
-    pitch.scatter(goals.x, goals.y,
-                  c="gold", s=500, marker="*", edgecolors="black", ax=ax)
-
-    go = len(goals)
-    of = len(off_target)
-    tr = len(trave)
-    on = len(on_target)
-    ax.set_title(f"Finalizações - {selected}", fontproperties=fnt, fontsize=30)
-    ax_text(50, 102, s=f'<Gols: {go}> | <Pra Fora: {of}> | <Trave: {tr}> | <No Alvo: {on}> | viz by @DataFutebol',
-        highlight_textprops=[{"color": "gold"}, {"color": "red"}, {"color":"blue"}, {"color":"green"}],
-        ax=ax, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
-
-    add_logo(fig, data['teamName'].iloc[0])
-    return fig
-
-def plot_heatmap(data, selected):
-    pitch = Pitch(pitch_type="opta", line_color="dimgray", pitch_color="#f7f7f7")
-    fig, ax = pitch.draw(figsize=(16, 11))
-    fig.set_facecolor("#f7f7f7")
-    act = data[data['isTouch'] == True]
-    pitch.kdeplot(act.x, act.y, ax=ax, shade=True, cmap="Reds", bw_adjust=1,
-                  levels=100, fill=True, alpha = 0.7)
-
-    ax.set_title(f"Heatmap - {selected}", fontproperties=fnt, fontsize=30)
-    add_logo(fig, data['teamName'].iloc[0])
-    return fig
-
-def show_visualization(data, selected, plot_choice):
-  if plot_choice == "Passes para o Terço Final":
-    st.pyplot(plot_passes_final(data_filtered, selected))
-  elif plot_choice == "Ações Defensivas":
-    st.pyplot(plot_defensivas(data_filtered, selected))
-  elif plot_choice == "Escanteios":
-    st.pyplot(plot_escanteios(data_filtered, selected))
-  elif plot_choice == "Dribles Completos":
-    st.pyplot(plot_dribles(data_filtered, selected))
-  elif plot_choice == "Passes Progressivos":
-    st.pyplot(plot_passes_progressivos(data_filtered, selected))
-  elif plot_choice == "Passes Certos e Errados":
-    st.pyplot(plot_passes_certos_errados(data_filtered, selected))
-  elif plot_choice == "Chances Criadas":
-    st.pyplot(plot_chances(data_filtered, selected))
-  elif plot_choice == "Ações Defensivas no Ataque":
-    st.pyplot(plot_defensivas_ataque(data_filtered, selected))
-  elif plot_choice == "Finalizações":
-    st.pyplot(plot_finalizacoes(data_filtered, selected))
-  elif plot_choice == "Mapa de Calor":
-    st.pyplot(plot_heatmap(data_filtered, selected))
-  elif plot_choice == "Passes para a Área":
-    st.pyplot(plot_boxpass(data_filtered, selected))
-
-def show_rankings(df):
+def mascara_chaves(chaves, match_id, team_name, player_name=None):
+    # Linhas (jogador x time x partida) das grades/zonas que batem com o filtro
+    mascara = chaves["teamId"].map(team_mapping) == team_name
+    if match_id is not None:
+        mascara &= chaves["matchId"] == match_id
+    if player_name is not None:
+        mascara &= chaves["playerName"] == player_name
+    return mascara
+
+def grade_heatmap(fonte, match_id, team_name, player_name=None):
+    chaves, grades = carregar_grades(fonte, versao)
+    return somar_grades(grades, mascara_chaves(chaves, match_id, team_name, player_name))
+
+def zonas_filtro(fonte, match_id, team_name, player_name=None):
+    chaves, cubo = carregar_zonas(fonte, versao)
+    return somar_zonas(cubo, mascara_chaves(chaves, match_id, team_name, player_name))
+
+def args_extras(plot_choice, filtro):
+    # Mapas que saem de agregados pré-calculados em vez dos eventos
+    if plot_choice == "Mapa de Calor":
+        # Soma das grades pré-calculadas em vez de refazer a partir dos eventos
+        with etapa("soma das grades"):
+            return (grade_heatmap(*filtro),)
+    if plot_choice == "Mapa de Zonas":
+        with etapa("soma das zonas"):
+            return (zonas_filtro(*filtro),)
+    if plot_choice == "Rede de Passes":
+        return (carregar_rede(filtro[0], versao, filtro[1], filtro[2]),)
+    return ()
+
+def show_zonas_confronto(fonte, match_id):
+    # Time x adversário por terço do campo: duas somas do cubo de zonas
+    times = opcoes_times(fonte, versao, match_id)
+    tabela = pd.concat({time: resumo_tercos(zonas_filtro(fonte, match_id, time)) for time in times}, axis=1)
+    st.markdown("**Ações por terço do campo no confronto**")
+    st.dataframe(tabela)
+
+def show_visualization(data, selected, plot_choice, filtro):
+    # Mesmo gráfico + mesmo filtro + mesma versão dos dados -> PNG do cache;
+    # os agregados (grades, zonas, rede) só são somados num miss.
+    # Versão da rodada da partida: uma rodada nova não invalida as partidas antigas
+    png = cache_figuras().renderizar(plot_choice, filtro, versao_dados(*filtro[:2]),
+                                     plot_functions[plot_choice], data, selected,
+                                     extras=lambda: args_extras(plot_choice, filtro))
+    with etapa("st.image"):
+        st.image(png)
+    if plot_choice == "Mapa de Zonas" and filtro[1] is not None and len(filtro) == 3:
+        show_zonas_confronto(filtro[0], filtro[1])
+
+def show_painel(data, selected, tipos, filtro, colunas=2):
+    # Vários gráficos da mesma fatia de uma vez: cada quadro da grade
+    # aparece assim que o seu gráfico fica pronto (agregados só dos que
+    # não estão no cache)
+
+    quadros = {}
+    for i in range(0, len(tipos), colunas):
+        for coluna, tipo in zip(st.columns(colunas), tipos[i:i + colunas]):
+            quadros[tipo] = coluna.empty()
+            quadros[tipo].caption(f"⏳ {tipo}")
+
+    with etapa("painel"):
+        pendentes = list(tipos)
+        for tentativa in range(2):
+            pool, quebrados = pool_painel(), []
+            for tipo, png, erro in renderizar_painel(pool, cache_figuras(), pendentes, filtro,
+                                                     versao_dados(*filtro[:2]), data, selected,
+                                                     lambda tipo: args_extras(tipo, filtro)):
+                if isinstance(erro, BrokenProcessPool) and tentativa == 0:
+                    quebrados.append(tipo)
+                elif erro is not None:
+                    quadros[tipo].error(f"{tipo}: {erro!r}")
+                else:
+                    quadros[tipo].image(png)
+            if not quebrados:
+                break
+            # Um processo do pool morreu e o pool inteiro não aceita mais
+            # tarefas: sobe outro (para todas as sessões) e refaz só os que faltaram
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool_painel.clear()
+            pendentes = quebrados
+
+def show_rankings(fonte, versao, match_id=None):
     st.title("📊 Rankings de Jogadores")
 
     # ----------------------------
     # FILTROS
     # ----------------------------
-    teams = sorted(df['teamName'].dropna().unique())
+    mode = st.radio("Modo de visualização:", ["Total", "Por jogo"], horizontal=True)
+    # Tabela com todas as métricas, calculada uma vez por versão/partida/modo
+    tabela = carregar_rankings(fonte, versao, match_id, mode)
+
+    teams = sorted(tabela['teamName'].dropna().unique())
     team_filter = st.selectbox("Selecione o time (ou Todos):", ["Todos"] + teams)
 
     min_games = st.number_input("Número mínimo de jogos:", min_value=1, value=1)
 
-    mode = st.radio("Modo de visualização:", ["Total", "Por jogo"])
-
-    # ----------------------------
-    # CÁLCULO DE MÉTRICAS
-    # ----------------------------
-    # contar jogos distintos por jogador
-    games_played = df.groupby("playerName")["matchId"].nunique().reset_index()
-    games_played.columns = ["playerName", "Jogos"]
-
-    # agregar métricas
-    agg_funcs = {
-        # Passes
-        "passAccurate": "sum",
-        "passInaccurate": "sum",
-        "box_entry": "sum",
-        "progressive_action": "sum",
-        "last_third_entry": "sum",
-
-        # Ataque
-        "isGoal": "sum",
-        "assist": "sum",
-        "passKey": "sum",
-        "passCornerAccurate": "sum",
-        "passCornerInaccurate": "sum",
-        "shotsTotal": "sum",
-        "shotOnTarget": "sum",
-        "shotOffTarget": "sum",
-        "shotOnPost": "sum",
-        "dribbleWon": "sum",
-        "dribbleLost": "sum",
-
-        # Defesa
-        "tackleWon": "sum",
-        "tackleLost": "sum",
-        "ballRecovery": "sum",
-        "clearanceTotal": "sum",
-        "interceptionAll": "sum",
-        "foulCommitted": "sum",
-    }
-
-    stats = df.groupby(["playerName", "teamName"]).agg(agg_funcs).reset_index()
-    stats = stats.merge(games_played, on="playerName", how="left")
-
-    # calcular derivados
-    stats["Passes Totais"] = stats["passAccurate"] + stats["passInaccurate"]
-    stats["Passes Certos"] = stats["passAccurate"]
-    stats["Passes Errados"] = stats["passInaccurate"]
-    stats["Aproveitamento nos Passes"] = (stats["passAccurate"] / stats["Passes Totais"] * 100).round(1)
-
-    stats["Passes para a Área"] = stats["box_entry"]
-    stats["Passes Progressivos"] = stats["progressive_action"]
-    stats["Passes para o Terço Final"] = stats["last_third_entry"]
-
-    stats["Gols"] = stats["isGoal"]
-    stats["Assistências"] = stats["assist"]
-    stats["Chances Criadas"] = stats["passKey"]
-
-    stats["Escanteios Certos"] = stats["passCornerAccurate"]
-    stats["Escanteios Errados"] = stats["passCornerInaccurate"]
-    stats["Acerto nos Escanteios"] = (stats["passCornerAccurate"] / (stats["passCornerAccurate"] + stats["passCornerInaccurate"]) * 100).round(1)
-
-    stats["Finalizações"] = stats["shotsTotal"]
-    stats["Finalizações no Alvo"] = stats["shotOnTarget"]
-    stats["Finalizações pra Fora"] = stats["shotOffTarget"]
-    stats["Finalizações na Trave"] = stats["shotOnPost"]
-    stats["Taxa de Conversão"] = (stats["isGoal"] / stats["shotsTotal"] * 100).round(1)
-    stats["Aproveitamento nas Finalizações"] = (stats["shotOnTarget"] / stats["shotsTotal"] * 100).round(1)
-
-    stats["Dribles Totais"] = stats["dribbleWon"] + stats["dribbleLost"]
-    stats["Dribles Corretos"] = stats["dribbleWon"]
-    stats["Dribles Errados"] = stats["dribbleLost"]
-    stats["Aproveitamento nos Dribles"] = (stats["dribbleWon"] / stats["Dribles Totais"] * 100).round(1)
-
-    stats["Desarmes"] = stats["tackleWon"] + stats["tackleLost"]
-    stats["Bolas Recuperadas"] = stats["ballRecovery"]
-    stats["Rebatidas"] = stats["clearanceTotal"]
-    stats["Interceptações"] = stats["interceptionAll"]
-    stats["Faltas"] = stats["foulCommitted"]
-
     # ----------------------------
-    # AJUSTE TOTAL vs POR JOGO
+    # ORDENAÇÃO E PÁGINA (no servidor: só a página visível vai pro navegador)
     # ----------------------------
-    if mode == "Por jogo":
-        for col in [
-            "Passes Totais", "Passes Certos", "Passes Errados", "Passes para a Área",
-            "Passes Progressivos", "Passes para o Terço Final",
-            "Gols", "Assistências", "Chances Criadas",
-            "Escanteios Certos", "Escanteios Errados",
-            "Finalizações", "Finalizações no Alvo", "Finalizações pra Fora", "Finalizações na Trave",
-            "Dribles Totais", "Dribles Corretos", "Dribles Errados",
-            "Desarmes", "Bolas Recuperadas", "Rebatidas", "Interceptações", "Faltas"
-        ]:
-            stats[col] = (stats[col] / stats["Jogos"]).round(2)
+    categoria = st.radio("Tabela:", list(COLUNAS_RANKING), horizontal=True)
+    col1, col2, col3 = st.columns(3)
+    metrica = col1.selectbox("Ordenar por:", COLUNAS_RANKING[categoria])
+    ordem = col2.selectbox("Ordem:", ["Maior → menor", "Menor → maior"])
+    tamanho = col3.selectbox("Jogadores por página:", [25, 50, 100])
 
-    # ----------------------------
-    # FILTROS FINAIS
-    # ----------------------------
+    mascara = tabela["Jogos"] >= min_games
     if team_filter != "Todos":
-        stats = stats[stats["teamName"] == team_filter]
-
-    stats = stats[stats["Jogos"] >= min_games]
+        mascara &= tabela["teamName"] == team_filter
+    total = int(mascara.sum())
+    paginas = max(1, -(-total // tamanho))
+    # Uma chave por combinação de filtros: mudou o filtro, volta à página 1
+    filtros = (versao, match_id, mode, team_filter, min_games, metrica, ordem, tamanho)
+    pagina = int(st.number_input("Página:", min_value=1, max_value=paginas, value=1,
+                                 key=f"pagina_rankings_{hash(filtros)}"))
+
+    with etapa("top-n"):
+        visiveis = top_n(tabela[mascara], metrica, tamanho, (pagina - 1) * tamanho,
+                         decrescente=ordem == "Maior → menor")
 
     # ----------------------------
-    # TABELAS
+    # TABELA
     # ----------------------------
-    st.subheader("🎯 Passes")
-    st.dataframe(stats[["playerName", "teamName", "Jogos",
-                        "Passes Totais", "Passes Certos", "Passes Errados", "Aproveitamento nos Passes",
-                        "Passes para a Área", "Passes Progressivos", "Passes para o Terço Final"]])
-
-    st.subheader("⚡ Ataque")
-    st.dataframe(stats[["playerName", "teamName", "Jogos",
-                        "Gols", "Assistências", "Chances Criadas",
-                        "Escanteios Certos", "Escanteios Errados", "Acerto nos Escanteios",
-                        "Finalizações", "Finalizações no Alvo", "Finalizações pra Fora", "Finalizações na Trave",
-                        "Taxa de Conversão", "Aproveitamento nas Finalizações",
-                        "Dribles Totais", "Dribles Corretos", "Dribles Errados", "Aproveitamento nos Dribles"]])
-
-    st.subheader("🛡️ Defesa")
-    st.dataframe(stats[["playerName", "teamName", "Jogos",
-                        "Desarmes", "Bolas Recuperadas", "Rebatidas", "Interceptações", "Faltas"]])
-
-def show_comparacao(df):
+    with etapa("tabelas"):
+        st.subheader(categoria)
+        st.caption(f"{total} jogadores | página {pagina} de {paginas}")
+        st.dataframe(visiveis[["playerName", "teamName", "Jogos"] + COLUNAS_RANKING[categoria]],
+                     hide_index=True)
+
+def levar_ao_radar(pares):
+    # Preenche os seletores de time/jogador do radar (callback do botão,
+    # roda antes dos widgets serem recriados)
+    for i in range(4):
+        time, jogador = pares[i] if i < len(pares) else ('Nenhum', 'Nenhum')
+        st.session_state[f"time_{i}"] = time
+        st.session_state[f"jogador_{i}"] = jogador
+
+def show_comparacao(stats_per_game, percentis, indice_semelhantes):
     st.title("📈 Comparação de Jogadores")
 
+    times_all = sorted(stats_per_game["teamName"].dropna().unique())
+
     # ----------------------------
-    # 1. Pré-processamento e agregação (mantido)
+    # 1. Busca de jogadores semelhantes
     # ----------------------------
-    agg_funcs = {
-        "passAccurate": "sum", "passInaccurate": "sum", "box_entry": "sum",
-        "progressive_action": "sum", "last_third_entry": "sum", "isGoal": "sum",
-        "assist": "sum", "passKey": "sum", "passCornerAccurate": "sum",
-        "passCornerInaccurate": "sum", "shotsTotal": "sum", "shotOnTarget": "sum",
-        "shotOffTarget": "sum", "shotOnPost": "sum", "dribbleWon": "sum",
-        "dribbleLost": "sum", "tackleWon": "sum", "tackleLost": "sum",
-        "ballRecovery": "sum", "clearanceTotal": "sum", "interceptionAll": "sum",
-        "foulCommitted": "sum",
-    }
-    
-    stats = df.groupby(["playerName", "teamName"]).agg(agg_funcs).reset_index()
-    games_played = df.groupby(["playerName", "teamName"])["matchId"].nunique().reset_index()
-    games_played.columns = ["playerName", "teamName", "Jogos"]
-    stats = stats.merge(games_played, on=["playerName", "teamName"], how="left")
-    
-    # Calcular médias por jogo
-    cols_to_avg = [col for col in agg_funcs.keys()]
-    stats_per_game = stats.set_index(["playerName", "teamName"])[cols_to_avg].div(stats["Jogos"].values, axis=0).reset_index()
-
-    # Calcular as estatísticas específicas com base nas médias
-    stats_per_game["Passes Totais"] = stats_per_game["passAccurate"] + stats_per_game["passInaccurate"]
-    stats_per_game["Aproveitamento nos Passes"] = np.where(stats_per_game["Passes Totais"] > 0, (stats_per_game["passAccurate"] / stats_per_game["Passes Totais"] * 100).round(1), 0)
-    stats_per_game["Passes para a Área"] = stats_per_game["box_entry"]
-    stats_per_game["Passes Progressivos"] = stats_per_game["progressive_action"]
-    stats_per_game["Passes para o Terço Final"] = stats_per_game["last_third_entry"]
-    stats_per_game["Gols"] = stats_per_game["isGoal"]
-    stats_per_game["Assistências"] = stats_per_game["assist"]
-    stats_per_game["Chances Criadas"] = stats_per_game["passKey"]
-    stats_per_game["Taxa de Conversão"] = np.where(stats_per_game["shotsTotal"] > 0, (stats_per_game["isGoal"] / stats_per_game["shotsTotal"] * 100).round(1), 0)
-    stats_per_game["Aproveitamento nos Dribles"] = np.where((stats_per_game["dribbleWon"] + stats_per_game["dribbleLost"]) > 0, (stats_per_game["dribbleWon"] / (stats_per_game["dribbleWon"] + stats_per_game["dribbleLost"]) * 100).round(1), 0)
-    stats_per_game["Desarmes"] = stats_per_game["tackleWon"]
-    stats_per_game["Interceptações"] = stats_per_game["interceptionAll"]
-    stats_per_game["Rebatidas"] = stats_per_game["clearanceTotal"]
-    stats_per_game["Bolas Recuperadas"] = stats_per_game["ballRecovery"]
-
-    # Estatísticas disponíveis para seleção
-    available_stats = [
-        "Passes Totais", "Aproveitamento nos Passes", "Passes para a Área",
-        "Passes Progressivos", "Passes para o Terço Final", "Gols",
-        "Assistências", "Chances Criadas", "Taxa de Conversão",
-        "Aproveitamento nos Dribles", "Desarmes", "Interceptações",
-        "Rebatidas", "Bolas Recuperadas"
-    ]
-    
+    st.markdown("### Jogadores Semelhantes")
+    st.markdown("Escolha um jogador para ver os mais parecidos com ele nas médias por jogo de todas as estatísticas do radar.")
+
+    col1, col2, col3, col4 = st.columns(4)
+    ref_time = col1.selectbox("Time", ['Nenhum'] + times_all, key="ref_time")
+    if ref_time != 'Nenhum':
+        jogadores_ref = sorted(stats_per_game[stats_per_game["teamName"] == ref_time]["playerName"].dropna().unique())
+        ref_jogador = col2.selectbox("Jogador", jogadores_ref, key="ref_jogador")
+        filtro_times = col3.multiselect("Só dos times:", times_all, key="ref_times")
+        min_jogos = col4.number_input("Mínimo de jogos:", min_value=1, value=1, step=1, key="ref_min_jogos")
+
+        with etapa("vizinhos"):
+            parecidos = semelhantes(indice_semelhantes, ref_jogador, ref_time,
+                                    times=filtro_times, min_jogos=min_jogos)
+        if parecidos.empty:
+            st.info("Nenhum jogador passa nos filtros.")
+        else:
+            st.dataframe(parecidos, hide_index=True)
+            # O jogador de referência + os 3 mais parecidos vão para o radar
+            pares = [(ref_time, ref_jogador)] + list(zip(parecidos["teamName"], parecidos["playerName"]))[:3]
+            st.button("Comparar no radar", on_click=levar_ao_radar, args=(pares,))
+
     # ----------------------------
     # 2. Widgets para seleção de jogadores e estatísticas
     # ----------------------------
-    times_all = sorted(stats["teamName"].dropna().unique())
-    
     st.markdown("### Seleção de Jogadores")
     st.markdown("Selecione um time, e em seguida um jogador. Você pode selecionar até 4 jogadores.")
     
@@ -607,13 +345,13 @@ def show_comparacao(df):
             time = st.selectbox(f"Time {i+1}", ['Nenhum'] + times_all, key=f"time_{i}")
             jogador = 'Nenhum'
             if time != 'Nenhum':
-                jogadores_do_time = sorted(stats[stats["teamName"] == time]["playerName"].dropna().unique())
+                jogadores_do_time = sorted(stats_per_game[stats_per_game["teamName"] == time]["playerName"].dropna().unique())
                 jogador = st.selectbox(f"Jogador {i+1}", ['Nenhum'] + jogadores_do_time, key=f"jogador_{i}")
             
             if jogador != 'Nenhum':
                 jogadores_selecionados.append(jogador)
     
-    selected_stats = st.multiselect("Escolha de 4 a 10 estatísticas:", available_stats)
+    selected_stats = st.multiselect("Escolha de 4 a 10 estatísticas:", ESTATISTICAS_RADAR)
 
     if not (4 <= len(selected_stats) <= 10):
         st.info("Escolha **entre 4 e 10 estatísticas** para montar o radar.")
@@ -626,13 +364,8 @@ def show_comparacao(df):
     # -----------------------------------------------------------------
     # 3. Preparar os dados para o gráfico de radar (com percentil global)
     # -----------------------------------------------------------------
-    df_plot = stats_per_game[stats_per_game["playerName"].isin(jogadores_selecionados)].copy()
-    
-    for stat in selected_stats:
-        # Calcula o percentil de cada jogador em relação a TODOS os jogadores na base de dados
-        all_stats = stats_per_game[stat].dropna().values
-        # Usando rankdata para percentil
-        df_plot[stat] = [rankdata(all_stats, method='average')[np.argwhere(all_stats == x)[0][0]] / len(all_stats) for x in df_plot[stat]]
+    # Percentil global já calculado para todos os jogadores: só buscar as linhas
+    df_plot = percentis[percentis["playerName"].isin(jogadores_selecionados)]
 
     df_plot_long = df_plot.melt(id_vars="playerName", value_vars=selected_stats, var_name="Estatística", value_name="Percentil")
 
@@ -675,7 +408,8 @@ def show_comparacao(df):
         )
     )
     
-    st.plotly_chart(fig)
+    with etapa("st.plotly_chart"):
+        st.plotly_chart(fig)
 def show_contato():
     st.title("📬 Contato")
 
@@ -701,51 +435,174 @@ def show_contato():
 
     st.info("Obrigado por visitar o DataFutebol!")
 
-# ======================================================
+# ===========================
 # APP
-# ======================================================
-
+# ===========================
 st.sidebar.title("Menu")
-if menu_option == "Visualizações":
-    view_option = st.radio("Deseja visualizar por:", ["Jogador", "Time"], key="view_option")
-
-    if view_option == "Jogador":
-        # Primeiro escolhe o time
-        selected_team = st.selectbox(
-            "Escolha o time:",
-            sorted(df_filtered['teamName'].dropna().unique()),
-            key="team_for_player"
-        )
+menu_option = st.sidebar.radio(
+    "Navegação",
+    ["Visualizações", "Rankings", "Comparação", "Contato"],
+    key="menu_option"
+)
 
-        # Filtra apenas jogadores desse time
-        players_in_team = sorted(df_filtered[df_filtered['teamName'] == selected_team]['playerName'].dropna().unique())
+# Medição do rerun: ?debug=1 abre o painel na barra lateral,
+# ?perfil=1 roda o cProfile neste rerun. O corpo da página fica dentro do
+# medir_rerun para o profiler nunca ficar ligado depois de um st.stop()
+debug = st.query_params.get("debug") == "1"
+with medir_rerun(perfil=st.query_params.get("perfil") == "1", menu=menu_option) as medicao:
+    st.subheader("👋 Seja bem-vindo ao aplicativo do DataFutebol")
+    st.markdown("Nos siga nas Redes Sociais → **@DataFutebol** | Apoie o projeto! Chave Pix-> iolncant@gmail.com")
+
+    # ===========================
+    # BIBLIOTECAS POR PÁGINA
+    # ===========================
+    # Importadas depois do cabeçalho (que já aparece no navegador) e só nas
+    # páginas que usam: o Contato sobe sem pandas, pyarrow, scipy e matplotlib.
+    # Nos reruns seguintes os módulos já estão em sys.modules e não custam nada.
+    # O orçamento da página fria é conferido pelo benchmark.py.
+    PAGINAS_DADOS = ["Visualizações", "Rankings", "Comparação"]
+
+    with etapa("imports"):
+        if menu_option in PAGINAS_DADOS:
+            import pandas as pd
+            from estatisticas import (
+                COLUNAS_RANKING, ESTATISTICAS_RADAR, construir_cubo, agregar_jogadores, por_jogo,
+                matriz_percentis, tabela_rankings, top_n, indexar_semelhantes, semelhantes
+            )
+            from dados import (
+                COLUNAS_PARTIDAS, COLUNAS_STATS, COLUNAS_TOQUES, ler_eventos, versao_dados,
+                ler_indice, fatiar, listar_fontes, ler_times, ler_cubo, ler_grades
+            )
+        if menu_option == "Visualizações":
+            from concurrent.futures.process import BrokenProcessPool
+            from cache_figuras import CacheFiguras
+            from heatmap import construir_grades, somar_grades
+            from zonas import construir_zonas, somar_zonas, resumo_tercos
+            from posses import rede_de_passes
+            from plots import plot_types, plot_functions
+            from painel import criar_pool, renderizar_painel
+            from assets import verificar_assets
+        elif menu_option in ["Rankings", "Comparação"]:
+            from xt import anexar_xt
+        if menu_option == "Comparação":
+            import plotly.graph_objects as go
+
+    # 🔑 Só carrega os dados quando precisar
+    if menu_option in PAGINAS_DADOS:
+        # teamId -> nome, vindo dos dados (times.csv) em vez de fixo no código
+        team_mapping = carregar_times()
+        team_ids = {nome: team_id for team_id, nome in team_mapping.items()}
+
+        # Competição/temporada: só as partições escolhidas são abertas
+        fontes = listar_fontes()
+        if not fontes:
+            st.error("Nenhuma base de eventos encontrada (pasta eventos/ ou BRA25.parquet)!")
+            st.stop()  # encerra se não achou os dados
+
+        competicao = st.sidebar.selectbox("Competição:", sorted({comp for comp, _ in fontes}))
+        temporada = st.sidebar.selectbox("Temporada:", [temp for comp, temp in fontes if comp == competicao])
+        fonte = fontes[(competicao, temporada)]
+        versao = versao_dados(fonte)
+        marcar(competicao=competicao, temporada=temporada, versao=versao)
+
+        confrontos = carregar_partidas(fonte, versao)
+        if not confrontos:
+            st.stop()  # encerra se não achou os dados
+
+        # ===========================
+        # FILTRO POR PARTIDA (CONFRONTO)
+        # ===========================
+        st.sidebar.subheader("Filtrar por Partida")
+        # Partida escolhida (None = todas)
+        match_id = st.sidebar.selectbox("Escolha a partida:", [None] + list(confrontos),
+                                        format_func=lambda m: "Todos" if m is None else confrontos[m])
+        marcar(match_id=match_id)
+
+
+    st.sidebar.title("Menu")
+    if menu_option == "Visualizações":
+        # Logos e fontes só na página que desenha
+        assets_faltando = carregar_assets(tuple(sorted(team_ids)))
+
+        # Listas de opções e fatias memorizadas por versão + filtro: um clique
+        # num widget não varre nem copia a base
+        teams_in_match = opcoes_times(fonte, versao, match_id)
+
+        view_option = st.radio("Deseja visualizar por:", ["Jogador", "Time"], key="view_option")
+
+        if view_option == "Jogador":
+            # Primeiro escolhe o time
+            selected_team = st.selectbox(
+                "Escolha o time:",
+                teams_in_match,
+                key="team_for_player"
+            )
 
-        # Agora o usuário escolhe o jogador dentro do time
-        selected_player = st.selectbox(
-            "Escolha o jogador:",
-            players_in_team,
-            key="player_viz"
-        )
+            # Filtra apenas jogadores desse time
+            players_in_team = opcoes_jogadores(fonte, versao, team_ids[selected_team], match_id)
 
-        # Filtrar os dados
-        data_filtered = df_filtered[df_filtered['playerName'] == selected_player]
+            # Agora o usuário escolhe o jogador dentro do time
+            selected_player = st.selectbox(
+                "Escolha o jogador:",
+                players_in_team,
+                key="player_viz"
+            )
+
+            # Filtrar os dados (fatia contígua do índice)
+            data_filtered = filtrar(fonte, versao, team_ids[selected_team], selected_player, match_id)
+
+        else:
+            # Visualização por time
+            selected_team = st.selectbox(
+                "Escolha o time:",
+                teams_in_match,
+                key="team_viz"
+            )
+            data_filtered = filtrar(fonte, versao, team_ids[selected_team], match_id=match_id)
+
+        if view_option == "Jogador":
+            selected, filtro = selected_player, (fonte, match_id, selected_team, selected_player)
+        else:
+            selected, filtro = selected_team, (fonte, match_id, selected_team)
+        marcar(time=selected_team, jogador=filtro[3] if len(filtro) > 3 else None, eventos=len(data_filtered))
+
+        modo_viz = st.radio("Exibir:", ["Um gráfico", "Painel"], horizontal=True, key="modo_viz")
+        if modo_viz == "Painel":
+            # Subconjunto dos gráficos, todos de uma vez
+            tipos = st.multiselect("Gráficos do painel:", plot_types, default=plot_types, key="plots_painel")
+            marcar(plot="painel", graficos=len(tipos))
+            show_painel(data_filtered, selected, tipos, filtro)
+        else:
+            # Tipo de plotagem
+            plot_choice = st.selectbox("Escolha o tipo de plotagem:", plot_types, key="plot_choice")
+            marcar(plot=plot_choice)
+            show_visualization(data_filtered, selected, plot_choice, filtro)
+
+    elif menu_option == "Rankings":
+        show_rankings(fonte, versao, match_id)
+    elif menu_option == "Comparação":
+        show_comparacao(*carregar_percentis(fonte, versao, match_id), carregar_semelhantes(fonte, versao, match_id))
+    elif menu_option == "Contato":
+        show_contato()
 
-    else:
-        # Visualização por time
-        selected_team = st.selectbox(
-            "Escolha o time:",
-            sorted(df_filtered['teamName'].dropna().unique()),
-            key="team_viz"
+# ===========================
+# DEPURAÇÃO
+# ===========================
+perfil, resumo = medicao["perfil"], medicao["resumo"]
+if debug or perfil is not None:
+    with st.sidebar.expander("⏱️ Depuração", expanded=True):
+        legenda = f"Rerun: {resumo['total_ms']} ms"
+        if resumo["rss_mb"] is not None:
+            legenda += f" | RSS: {resumo['rss_mb']} MB ({resumo['rss_delta_mb']:+} MB)"
+        st.caption(legenda)
+        st.dataframe(
+            [{"etapa": "· " * e["nivel"] + e["etapa"], "ms": e.get("ms"), "Δ RSS (MB)": e.get("rss_mb")}
+             for e in resumo["etapas"]],
+            hide_index=True
         )
-        data_filtered = df_filtered[df_filtered['teamName'] == selected_team]
-
-    # Tipo de plotagem
-    plot_choice = st.selectbox("Escolha o tipo de plotagem:", plot_types, key="plot_choice")
-    show_visualization(data_filtered, selected_player if view_option=="Jogador" else selected_team, plot_choice)
-
-elif menu_option == "Rankings":
-    show_rankings(df_filtered)
-elif menu_option == "Comparação":
-    show_comparacao(df_filtered)
-elif menu_option == "Contato":
-    show_contato()
+        detalhes = {"tags": resumo["tags"]}
+        if menu_option == "Visualizações":
+            detalhes.update(figuras=cache_figuras().estatisticas(), assets_faltando=assets_faltando)
+        st.json(detalhes, expanded=False)
+        if perfil is not None:
+            st.code(resumo_perfil(perfil))
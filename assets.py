@@ -0,0 +1,80 @@
+import logging
+import os
+import threading
+
+import matplotlib.font_manager as fm
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# ===========================
+# LOGOS E FONTES
+# ===========================
+# Logos ficam na raiz do projeto como "<teamName>.png" (nomes do times.csv);
+# caminhos relativos são resolvidos a partir dela, não do diretório atual
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+PASTA_LOGOS = RAIZ
+
+FONTE_TITULO = "BigShoulders_18pt-Regular.ttf"
+
+# Lado máximo do logo em pixels: o eixo do logo ocupa 0.1 x 0.1 da
+# figura 16x11 pol. a 100 dpi, ou seja no máximo 160 px
+LOGO_PX = 160
+
+# Registro por processo, compartilhado por todas as sessões (só leitura)
+_logos = {}
+_fontes = {}
+_faltando = set()
+_lock = threading.Lock()
+
+
+def _decodificar_logo(caminho, px=LOGO_PX):
+    with Image.open(caminho) as img:
+        img = img.convert("RGBA")
+        img.thumbnail((px, px), Image.LANCZOS)
+        logo = np.asarray(img)
+    logo.setflags(write=False)
+    return logo
+
+
+def logo(team_name, pasta=PASTA_LOGOS):
+    # Logo decodificado e reduzido; None se o arquivo não existe/não abre
+    with _lock:
+        if team_name in _logos:
+            return _logos[team_name]
+        caminho = os.path.join(pasta, f"{team_name}.png")
+        try:
+            _logos[team_name] = _decodificar_logo(caminho)
+        except (OSError, ValueError):
+            _logos[team_name] = None
+            _faltando.add(caminho)
+        return _logos[team_name]
+
+
+def fonte(arquivo=FONTE_TITULO):
+    # Resolvida uma vez por processo e com caminho absoluto (não depende do
+    # diretório atual na hora de desenhar); sem o arquivo, fonte padrão
+    with _lock:
+        if arquivo not in _fontes:
+            caminho = os.path.join(RAIZ, arquivo)
+            if os.path.exists(caminho):
+                _fontes[arquivo] = fm.FontProperties(fname=caminho)
+            else:
+                _fontes[arquivo] = fm.FontProperties(family=["sans-serif"])
+                _faltando.add(caminho)
+        return _fontes[arquivo]
+
+
+def verificar_assets(team_names, fontes=(FONTE_TITULO,)):
+    # Carrega tudo de uma vez (na subida do app/lote) e avisa o que falta,
+    # em vez de cada render falhar calado
+    for arquivo in fontes:
+        fonte(arquivo)
+    for team_name in team_names:
+        logo(team_name)
+    with _lock:
+        faltando = sorted(_faltando)
+    if faltando:
+        logger.warning("assets não encontrados: %s", ", ".join(faltando))
+    return faltando
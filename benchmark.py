@@ -0,0 +1,269 @@
+import matplotlib
+matplotlib.use("Agg")
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from cache_figuras import CacheFiguras, figura_para_png
+from dados import (
+    COLUNAS_MAPAS, COLUNAS_PARTIDAS, COLUNAS_STATS, COLUNAS_TOQUES, PASTA_EVENTOS,
+    abrir_espelho, caminho_espelho, fatiar, gravar_espelho, indexar, ler_eventos, ler_times,
+)
+from estatisticas import agregar_jogadores, construir_cubo, matriz_percentis, por_jogo
+from gerar_eventos import gravar_base
+from heatmap import construir_grades
+from posses import COLUNAS_ORDEM, anexar_posses
+from zonas import construir_zonas
+from xt import ajustar_xt, valor_xt
+from painel import criar_pool, renderizar_painel
+from plots import plot_functions, plot_types
+
+# ===========================
+# BENCHMARK
+# ===========================
+# python benchmark.py --escala 1 [--salvar] [--tolerancia 0.2]
+# Gera (uma vez) eventos sintéticos na escala pedida, mede tempo e pico de
+# memória de cada etapa do app e compara com a baseline gravada.
+# Sai com código 1 se alguma etapa piorar além da tolerância ou se a
+# partida a frio do Contato estourar o orçamento.
+# python benchmark.py --so-contato: só a partida a frio do Contato (rápido,
+# sem gerar a base); o pytest confere o mesmo orçamento (test_contato.py).
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+PASTA_BENCH = os.path.join(tempfile.gettempdir(), "datafutebol-bench")
+
+
+def preparar_base(escala, pasta=PASTA_BENCH):
+    # Pasta de dados com eventos/competicao=SIN/temporada=<escala>x e
+    # times.csv, do jeito que o app espera (fontes e logos vêm do projeto)
+    raiz = os.path.join(pasta, f"{escala}x")
+    fonte = os.path.join(raiz, PASTA_EVENTOS, "competicao=SIN", f"temporada={escala}x")
+    if not os.path.exists(os.path.join(raiz, "pronto")):
+        gravar_base(fonte, escala)
+        open(os.path.join(raiz, "pronto"), "w").close()
+    repo = os.path.dirname(APP)
+    for nome in os.listdir(repo):
+        if nome.endswith(".csv") and not os.path.exists(os.path.join(raiz, nome)):
+            os.symlink(os.path.join(repo, nome), os.path.join(raiz, nome))
+    return raiz, fonte
+
+
+def medir(resultados, etapa, fn, repeticoes=1):
+    # Melhor tempo de N execuções + pico de memória numa execução rastreada
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        valor = fn()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    fn()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    resultados[etapa] = {"tempo_s": min(tempos), "pico_mb": pico / 1024 ** 2}
+    print(f"{etapa:<45} {min(tempos) * 1000:>10.1f} ms {pico / 1024 ** 2:>10.1f} MB", flush=True)
+    return valor
+
+
+def medir_paginas(resultados):
+    # Páginas inteiras do Streamlit (AppTest, sem navegador), frias e quentes
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    for pagina in ["Visualizações", "Rankings", "Comparação"]:
+        def rodar():
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            # Página escolhida já no primeiro run: sem ela o primeiro run
+            # seria o das Visualizações (padrão do menu), a frio
+            at = AppTest.from_file(APP, default_timeout=600)
+            at.session_state["menu_option"] = pagina
+            at.run()
+            if at.exception:
+                raise RuntimeError(at.exception[0].value)
+            return at
+        at = medir(resultados, f"pagina {pagina} (fria)", rodar)
+        medir(resultados, f"pagina {pagina} (rerun)", lambda: at.run())
+
+
+# Partida a frio (contêiner novo, health check): a página Contato roda num
+# processo Python novo e não pode passar do orçamento nem importar a pilha
+# científica (app.py só importa essas bibliotecas nas páginas de dados)
+ORCAMENTO_CONTATO_S = 1.0
+MODULOS_PESADOS = ["pandas", "pyarrow", "scipy", "matplotlib", "mplsoccer"]
+
+SCRIPT_CONTATO = """
+import json, resource, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+at.session_state["menu_option"] = "Contato"
+inicio = time.perf_counter()
+at.run()
+print(json.dumps({
+    "tempo_s": time.perf_counter() - inicio,
+    "pico_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "pesados": sorted(m for m in sys.argv[2:] if m in sys.modules),
+    "erros": [str(e.value) for e in at.exception],
+}))
+"""
+
+
+def medir_partida_fria(resultados):
+    saida = subprocess.run([sys.executable, "-c", SCRIPT_CONTATO, APP] + MODULOS_PESADOS,
+                           capture_output=True, text=True, check=True)
+    medida = json.loads(saida.stdout.splitlines()[-1])
+    if medida["erros"]:
+        raise RuntimeError(medida["erros"][0])
+    resultados["pagina Contato (processo novo)"] = {k: medida[k] for k in ["tempo_s", "pico_mb", "pesados"]}
+    print(f"{'pagina Contato (processo novo)':<45} {medida['tempo_s'] * 1000:>10.1f} ms "
+          f"{medida['pico_mb']:>10.1f} MB (RSS)", flush=True)
+
+
+def checar_orcamento(atual):
+    medida = atual["etapas"]["pagina Contato (processo novo)"]
+    estouros = []
+    if medida["tempo_s"] > ORCAMENTO_CONTATO_S:
+        estouros.append(f"pagina Contato: {medida['tempo_s']:.3f} s > {ORCAMENTO_CONTATO_S} s")
+    if medida["pesados"]:
+        estouros.append(f"pagina Contato importou {', '.join(medida['pesados'])}")
+    return estouros
+
+
+def rodar_benchmark(escala=1, repeticoes=1, paginas=True, plots_temporada=True):
+    # Tudo lê os dados da pasta de trabalho (DATAFUTEBOL_DADOS)
+    raiz, fonte = preparar_base(escala)
+    anterior = os.environ.get("DATAFUTEBOL_DADOS")
+    os.environ["DATAFUTEBOL_DADOS"] = raiz
+    try:
+        return _etapas(escala, fonte, repeticoes, paginas, plots_temporada)
+    finally:
+        if anterior is None:
+            del os.environ["DATAFUTEBOL_DADOS"]
+        else:
+            os.environ["DATAFUTEBOL_DADOS"] = anterior
+
+
+def _etapas(escala, fonte, repeticoes, paginas, plots_temporada):
+    team_mapping = ler_times()
+    resultados = {}
+    medir_partida_fria(resultados)
+
+    # Leitura
+    medir(resultados, "ler_eventos partidas", lambda: ler_eventos(fonte, COLUNAS_PARTIDAS), repeticoes)
+    stats = medir(resultados, "ler_eventos stats", lambda: ler_eventos(fonte, COLUNAS_STATS), repeticoes)
+    mapas = medir(resultados, "ler_eventos mapas", lambda: ler_eventos(fonte, COLUNAS_MAPAS + COLUNAS_ORDEM),
+                  repeticoes)
+    toques = medir(resultados, "ler_eventos toques", lambda: ler_eventos(fonte, COLUNAS_TOQUES), repeticoes)
+
+    # Agregações
+    medir(resultados, "xT (ajustar + valor)", lambda: valor_xt(stats, ajustar_xt(stats)), repeticoes)
+    cubo = medir(resultados, "construir_cubo", lambda: construir_cubo(stats), repeticoes)
+    jogadores = medir(resultados, "agregar_jogadores", lambda: agregar_jogadores(cubo, team_mapping), repeticoes)
+    medir(resultados, "por_jogo + matriz_percentis",
+          lambda: matriz_percentis(por_jogo(jogadores)), repeticoes)
+    medir(resultados, "construir_grades", lambda: construir_grades(toques), repeticoes)
+
+    # Filtros da barra lateral
+    mapas["teamName"] = mapas["teamId"].map(team_mapping).astype("category")
+    medir(resultados, "anexar_posses", lambda: anexar_posses(mapas), repeticoes)
+    mapas = mapas.drop(columns=COLUNAS_ORDEM)
+    eventos, limites = medir(resultados, "indexar", lambda: indexar(mapas), repeticoes)
+    medir(resultados, "construir_zonas", lambda: construir_zonas(eventos), repeticoes)
+    team_id = int(limites["teamId"].iloc[0])
+    jogador = limites[limites["teamId"] == team_id]["playerName"].iloc[0]
+    partida = limites[limites["teamId"] == team_id]["matchId"].iloc[0]
+    time_temporada = medir(resultados, "fatiar time", lambda: fatiar(eventos, limites, team_id), repeticoes)
+    time_partida = medir(resultados, "fatiar time+partida",
+                         lambda: fatiar(eventos, limites, team_id, match_id=partida), repeticoes)
+    medir(resultados, "fatiar jogador", lambda: fatiar(eventos, limites, team_id, jogador), repeticoes)
+
+    # Espelho Arrow (DATAFUTEBOL_ESPELHO): gravar uma vez, abrir por processo
+    espelho = caminho_espelho(fonte, "bench", team_mapping, os.path.join(PASTA_BENCH, "espelho"))
+    medir(resultados, "gravar_espelho", lambda: gravar_espelho(eventos, limites, espelho), repeticoes)
+    medir(resultados, "abrir_espelho", lambda: abrir_espelho(espelho), repeticoes)
+
+    # Gráficos (figura + PNG): um time numa partida e na temporada inteira
+    # ("Todos", o pior caso, desenhado com nível de detalhe reduzido)
+    nome = team_mapping.get(team_id, str(team_id))
+    fatias = {"partida": time_partida}
+    if plots_temporada:
+        fatias["temporada"] = time_temporada
+    for rotulo, fatia in fatias.items():
+        for tipo in plot_types:
+            medir(resultados, f"plot {tipo} ({rotulo})",
+                  lambda: figura_para_png(plot_functions[tipo](fatia, nome)), repeticoes)
+
+    # Modo Painel: todos os gráficos da partida de uma vez, sem cache
+    pool = criar_pool()
+    medir(resultados, "painel (partida)",
+          lambda: list(renderizar_painel(pool, CacheFiguras(), plot_types, ("bench",), "bench",
+                                         time_partida, nome, lambda tipo: ())), repeticoes)
+    pool.shutdown()
+
+    if paginas:
+        medir_paginas(resultados)
+    return {"escala": escala, "eventos": len(mapas), "etapas": resultados}
+
+
+# Diferenças absolutas abaixo disso são ruído (tempo em s, memória em MB)
+PISO = {"tempo_s": 0.05, "pico_mb": 5}
+
+
+def comparar(atual, baseline, tolerancia):
+    # Lista as etapas que ficaram mais lentas ou mais pesadas que a baseline
+    piores = []
+    for etapa, medida in atual["etapas"].items():
+        base = baseline["etapas"].get(etapa)
+        if base is None:
+            continue
+        for campo in ["tempo_s", "pico_mb"]:
+            piora = medida[campo] - base[campo]
+            if piora > base[campo] * tolerancia and piora > PISO[campo]:
+                piores.append(f"{etapa} {campo}: {base[campo]:.3f} -> {medida[campo]:.3f}")
+    return piores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede tempo e memória de cada etapa do app")
+    parser.add_argument("--escala", type=int, default=1, choices=[1, 10, 100])
+    parser.add_argument("--repeticoes", type=int, default=3, help="vale o melhor tempo")
+    parser.add_argument("--sem-paginas", action="store_true", help="não roda as páginas via AppTest")
+    parser.add_argument("--sem-plots-temporada", action="store_true",
+                        help="não mede os gráficos com a temporada inteira de um time")
+    parser.add_argument("--baseline", default=None, help="padrão: benchmark_<escala>x.json")
+    parser.add_argument("--salvar", action="store_true", help="grava o resultado como nova baseline")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    parser.add_argument("--so-contato", action="store_true",
+                        help="só confere o orçamento da partida a frio do Contato")
+    args = parser.parse_args()
+
+    if args.so_contato:
+        etapas = {}
+        medir_partida_fria(etapas)
+        estouros = checar_orcamento({"etapas": etapas})
+        for linha in estouros:
+            print(f"ORÇAMENTO {linha}")
+        sys.exit(1 if estouros else 0)
+
+    arquivo = args.baseline or f"benchmark_{args.escala}x.json"
+    atual = rodar_benchmark(args.escala, args.repeticoes, not args.sem_paginas, not args.sem_plots_temporada)
+    estouros = checar_orcamento(atual)
+    for linha in estouros:
+        print(f"ORÇAMENTO {linha}")
+
+    if args.salvar:
+        with open(arquivo, "w", encoding="utf-8") as f:
+            json.dump(atual, f, indent=1, ensure_ascii=False)
+        print(f"baseline gravada em {arquivo}")
+    elif os.path.exists(arquivo):
+        with open(arquivo, encoding="utf-8") as f:
+            piores = comparar(atual, json.load(f), args.tolerancia)
+        for linha in piores:
+            print(f"REGRESSÃO {linha}")
+        sys.exit(1 if piores or estouros else 0)
+    sys.exit(1 if estouros else 0)
@@ -0,0 +1,151 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+
+from instrumentacao import etapa
+from plots import VERSAO_FIGURAS
+
+# Limite da pasta em disco (MB); acima dele saem os PNGs usados há mais tempo
+MAX_MB_DISCO = int(os.environ.get("DATAFUTEBOL_CACHE_FIGURAS_MB", 512))
+
+
+# ===========================
+# CACHE DE FIGURAS RENDERIZADAS
+# ===========================
+def chave_figura(tipo, filtro, versao):
+    # Endereçado por conteúdo: mesmo gráfico + mesmo filtro + mesma versão
+    # dos dados + mesma versão do desenho (plots.VERSAO_FIGURAS)
+    return hashlib.sha256(repr((tipo, filtro, versao, VERSAO_FIGURAS)).encode()).hexdigest()
+
+
+def figura_para_png(fig):
+    # Codifica e libera a figura mesmo se o savefig falhar (não fica figura
+    # aberta entre reruns, a memória do servidor não cresce com o uso)
+    buf = io.BytesIO()
+    try:
+        fig.savefig(buf, format="png", bbox_inches="tight", facecolor=fig.get_facecolor())
+    finally:
+        plt.close(fig)
+        fig.clear()
+    return buf.getvalue()
+
+
+class CacheFiguras:
+    # LRU em memória limitado por bytes, com pasta opcional em disco como
+    # segundo nível, também limitada (LRU pelo mtime, renovado a cada hit).
+    # Compartilhado entre sessões, então tudo sob um lock.
+
+    def __init__(self, max_bytes=64 * 1024 ** 2, pasta=None, max_bytes_disco=MAX_MB_DISCO * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self.max_bytes_disco = max_bytes_disco
+        self.pasta = pasta
+        self.hits = 0
+        self.hits_disco = 0
+        self.misses = 0
+        self._bytes = 0
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes_disco = 0
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+            self._limpar_disco()
+
+    def _arquivo(self, chave):
+        return os.path.join(self.pasta, f"{chave}.png")
+
+    def _limpar_disco(self):
+        # Recalcula o tamanho da pasta (outros processos também gravam nela)
+        # e apaga os menos usados até ficar em 90% do limite
+        arquivos = []
+        for entrada in os.scandir(self.pasta):
+            if entrada.name.endswith(".png"):
+                try:
+                    info = entrada.stat()
+                except FileNotFoundError:
+                    continue
+                arquivos.append((info.st_mtime, info.st_size, entrada.path))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        if total > self.max_bytes_disco:
+            for _, tamanho, caminho in sorted(arquivos):
+                if total <= 0.9 * self.max_bytes_disco:
+                    break
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+                total -= tamanho
+        self._bytes_disco = total
+
+    def _guardar(self, chave, png):
+        if chave in self._memoria:
+            self._bytes -= len(self._memoria.pop(chave))
+        self._memoria[chave] = png
+        self._bytes += len(png)
+        while self._bytes > self.max_bytes and len(self._memoria) > 1:
+            _, antigo = self._memoria.popitem(last=False)
+            self._bytes -= len(antigo)
+
+    def get(self, chave):
+        with self._lock:
+            png = self._memoria.get(chave)
+            if png is not None:
+                self._memoria.move_to_end(chave)
+                self.hits += 1
+                return png
+            if self.pasta and os.path.exists(self._arquivo(chave)):
+                try:
+                    with open(self._arquivo(chave), "rb") as f:
+                        png = f.read()
+                    os.utime(self._arquivo(chave))  # usado agora: último a sair
+                except FileNotFoundError:  # apagado por outro processo no meio
+                    self.misses += 1
+                    return None
+                self._guardar(chave, png)
+                self.hits_disco += 1
+                return png
+            self.misses += 1
+            return None
+
+    def put(self, chave, png):
+        with self._lock:
+            self._guardar(chave, png)
+        if self.pasta:
+            # grava em arquivo temporário e renomeia: leitores nunca veem PNG pela metade
+            tmp = f"{self._arquivo(chave)}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(png)
+            os.replace(tmp, self._arquivo(chave))
+            with self._lock:
+                self._bytes_disco += len(png)
+                if self._bytes_disco > self.max_bytes_disco:
+                    self._limpar_disco()
+
+    def renderizar(self, tipo, filtro, versao, plot_fn, *args, extras=None):
+        # Devolve o PNG do cache; só chama o matplotlib em caso de miss.
+        # extras(): argumentos a mais (agregados), montados também só no miss
+        chave = chave_figura(tipo, filtro, versao)
+        png = self.get(chave)
+        if png is None:
+            if extras is not None:
+                args += extras()
+            with etapa("figura"):
+                fig = plot_fn(*args)
+            with etapa("png"):
+                png = figura_para_png(fig)
+            self.put(chave, png)
+        return png
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "hits_disco": self.hits_disco,
+                "misses": self.misses,
+                "itens": len(self._memoria),
+                "bytes": self._bytes,
+                "bytes_disco": self._bytes_disco,
+            }
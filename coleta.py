@@ -0,0 +1,159 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dados import PASTA_EVENTOS, caminho_dados, derivar_flags, ler_manifesto
+from ingestao import adicionar_rodada
+
+# ===========================
+# COLETA DOS JSONS POR PARTIDA
+# ===========================
+# python coleta.py feeds/rodada12 --competicao BRA --temporada 2025 --rodada 12 -p 4
+# Cada arquivo é o matchCentreData de uma partida (solto ou dentro de
+# {"matchId": ..., "matchCentreData": {...}}; sem a chave, o matchId sai do
+# nome do arquivo). Os arquivos são lidos em paralelo, as flags do schema
+# do BRA25 saem de dados.derivar_flags (as mesmas regras dos eventos
+# sintéticos) com os marcadores vindos dos qualificadores, e a rodada
+# entra na base pelo mesmo caminho da ingestão (ingestao.py).
+# Arquivos com o mesmo conteúdo de uma coleta anterior são pulados.
+
+# Qualificadores do feed que viram marcadores das flags
+QUALIFICADORES = {
+    "escanteio": "CornerTaken",
+    "passFreekick": "FreekickTaken",
+    "passKey": "KeyPass",
+    "assist": "IntentionalGoalAssist",
+}
+
+
+def hash_arquivo(caminho):
+    with open(caminho, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _qualificadores(qualifiers):
+    # {flag: bool por evento}: os qualificadores de todos os eventos numa
+    # coluna só, marcados de uma vez por nome
+    lista = qualifiers.reset_index(drop=True).explode().dropna()
+    nomes = (pd.json_normalize(lista.tolist())["type.displayName"].to_numpy()
+             if len(lista) else np.empty(0, dtype=object))
+    linhas = lista.index.to_numpy()
+    flags = {}
+    for flag, nome in QUALIFICADORES.items():
+        marcado = np.zeros(len(qualifiers), dtype=bool)
+        marcado[linhas[nomes == nome]] = True
+        flags[flag] = marcado
+    return flags
+
+
+def _id_partida(doc, caminho):
+    if "matchId" in doc:
+        return int(doc["matchId"])
+    numeros = re.findall(r"\d+", os.path.basename(caminho))
+    if not numeros:
+        raise ValueError(f"{caminho}: sem matchId no JSON nem no nome do arquivo")
+    return int(numeros[-1])
+
+
+def ler_partida(caminho):
+    # (matchId, eventos no schema do BRA25) de um arquivo; só os eventos
+    # com jogador (início/fim de tempo e formação ficam de fora)
+    with open(caminho, encoding="utf-8") as f:
+        doc = json.load(f)
+    match_id = _id_partida(doc, caminho)
+    dados = doc.get("matchCentreData", doc)
+
+    ev = pd.json_normalize(dados["events"], max_level=1)
+    ev["eventId"] = np.arange(len(ev))  # ordem do feed (o eventId do feed é por time)
+    for col in ["playerId", "endX", "endY"]:
+        if col not in ev:
+            ev[col] = np.nan
+    if "qualifiers" not in ev:
+        ev["qualifiers"] = [[] for _ in range(len(ev))]
+    ev = ev[ev["playerId"].notna()].reset_index(drop=True)
+    nomes = {int(k): v for k, v in dados.get("playerIdNameDictionary", {}).items()}
+
+    tipo = ev["type.displayName"].to_numpy()
+    sucesso = (ev["outcomeType.displayName"] == "Successful").to_numpy()
+    x, y = ev["x"].to_numpy(dtype="float64"), ev["y"].to_numpy(dtype="float64")
+    end_x, end_y = ev["endX"].to_numpy(dtype="float64"), ev["endY"].to_numpy(dtype="float64")
+    q = _qualificadores(ev["qualifiers"])
+    toque = ev["isTouch"].fillna(False).to_numpy(dtype=bool) if "isTouch" in ev else None
+
+    player_id = ev["playerId"].astype("int64")
+    eventos = pd.DataFrame({
+        "matchId": match_id,
+        "teamId": ev["teamId"].astype("int64"),
+        "playerName": player_id.map(nomes).fillna(player_id.astype(str)),
+        "type": tipo,
+        "outcomeType": ev["outcomeType.displayName"],
+        "x": x, "y": y, "endX": end_x, "endY": end_y,
+        "home": dados["home"]["name"],
+        "away": dados["away"]["name"],
+        **derivar_flags(tipo, sucesso, x, y, end_x, end_y, q["escanteio"], q["passFreekick"],
+                        q["passKey"], q["assist"], toque),
+        "minute": ev["minute"].astype("int64"),
+        "second": ev["second"].fillna(0).astype("int64"),
+        "eventId": ev["eventId"],
+        "playerId": player_id,
+    })
+    return match_id, eventos
+
+
+# ===========================
+# RODADA A PARTIR DE UMA PASTA DE JSONS
+# ===========================
+def coletar_rodada(pasta_json, fonte, rodada, processos=None):
+    # Só os arquivos com hash novo são lidos (em paralelo); as partidas que
+    # não mudaram são copiadas da partição atual da rodada
+    arquivos = sorted(glob.glob(os.path.join(pasta_json, "*.json")))
+    hashes = {arq: hash_arquivo(arq) for arq in arquivos}
+    manifesto = ler_manifesto(fonte)
+    conhecidos = {}
+    if manifesto is not None:
+        conhecidos = manifesto["rodadas"].get(str(rodada), {}).get("hashes", {})
+    novos = [arq for arq in arquivos if hashes[arq] not in conhecidos]
+    if not novos:
+        return manifesto, 0
+
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        partidas = dict(zip(novos, pool.map(ler_partida, novos)))
+    ids = {match_id for match_id, _ in partidas.values()}
+    eventos = pd.concat([ev for _, ev in partidas.values()], ignore_index=True)
+
+    particao = os.path.join(fonte, f"rodada={rodada}")
+    if os.path.isdir(particao):
+        atuais = pd.read_parquet(particao)
+        eventos = pd.concat([atuais[~atuais["matchId"].isin(ids)], eventos], ignore_index=True)
+
+    hashes_rodada = {h: m for h, m in conhecidos.items() if m not in ids}
+    hashes_rodada.update({hashes[arq]: match_id for arq, (match_id, _) in partidas.items()})
+    return adicionar_rodada(fonte, rodada, eventos, hashes_rodada), len(novos)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adiciona uma rodada a partir dos JSONs das partidas")
+    parser.add_argument("pasta_json", help="pasta com um JSON por partida")
+    parser.add_argument("--competicao", required=True)
+    parser.add_argument("--temporada", required=True)
+    parser.add_argument("--rodada", required=True, type=int)
+    parser.add_argument("--pasta", default=caminho_dados(PASTA_EVENTOS))
+    parser.add_argument("-p", "--processos", type=int, default=None, help="padrão: nº de CPUs")
+    args = parser.parse_args()
+
+    fonte = os.path.join(args.pasta, f"competicao={args.competicao}", f"temporada={args.temporada}")
+    inicio = time.perf_counter()
+    manifesto, lidos = coletar_rodada(args.pasta_json, fonte, args.rodada, args.processos)
+    if lidos == 0:
+        print(f"{fonte}: rodada {args.rodada} sem arquivos novos")
+    else:
+        print(f"{fonte}: rodada {args.rodada}, {lidos} partidas lidas em "
+              f"{time.perf_counter() - inicio:.1f}s, versão {manifesto['versao']}")
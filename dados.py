@@ -0,0 +1,429 @@
+import hashlib
+import logging
+import os
+
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from scipy import sparse
+
+from estatisticas import AGG_COLS, CUBO_CHAVES
+from posses import COLUNAS_ORDEM, anexar_posses
+
+logger = logging.getLogger(__name__)
+
+# ===========================
+# BASE PARTICIONADA
+# ===========================
+# Os caminhos relativos dos dados partem da pasta do projeto (como os
+# assets), não do diretório atual; DATAFUTEBOL_DADOS aponta para outra
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+
+def caminho_dados(nome):
+    return os.path.join(os.environ.get("DATAFUTEBOL_DADOS", RAIZ), nome)
+
+
+# eventos/competicao=BRA/temporada=2025/rodada=1/*.parquet
+PASTA_EVENTOS = "eventos"
+
+# Base antiga de um arquivo só (Série A 2025), usada se não houver partições
+ARQUIVO_LEGADO = "BRA25.parquet"
+
+# teamId -> nome do time, para todas as competições
+ARQUIVO_TIMES = "times.csv"
+
+# Agregados mantidos pela ingestão incremental (ingestao.py), dentro da
+# pasta da temporada; o Arrow ignora pastas com "_" ao ler os eventos
+PASTA_AGREGADOS = "_agregados"
+
+
+def _valor_particao(nome, campo):
+    prefixo = f"{campo}="
+    return nome[len(prefixo):] if nome.startswith(prefixo) else None
+
+
+def listar_fontes(pasta=PASTA_EVENTOS):
+    # {(competicao, temporada): pasta}, só olhando nomes de diretório;
+    # nenhum parquet é aberto aqui
+    pasta = caminho_dados(pasta)
+    fontes = {}
+    if os.path.isdir(pasta):
+        for comp in sorted(os.listdir(pasta)):
+            competicao = _valor_particao(comp, "competicao")
+            if competicao is None:
+                continue
+            for temp in sorted(os.listdir(os.path.join(pasta, comp)), reverse=True):
+                temporada = _valor_particao(temp, "temporada")
+                if temporada is not None:
+                    fontes[(competicao, temporada)] = os.path.join(pasta, comp, temp)
+    if not fontes and os.path.exists(caminho_dados(ARQUIVO_LEGADO)):
+        fontes[("BRA", "2025")] = caminho_dados(ARQUIVO_LEGADO)
+    return fontes
+
+
+def ler_times(arquivo=ARQUIVO_TIMES):
+    times = pd.read_csv(caminho_dados(arquivo))
+    return dict(zip(times["teamId"], times["teamName"]))
+
+
+def ler_manifesto(fonte):
+    # {"versao": N, "rodadas": {"12": {"versao": N, "partidas": [...], "hashes": {...}}}}
+    # ("hashes" só nas rodadas vindas dos JSONs, coleta.py)
+    try:
+        with open(os.path.join(fonte, PASTA_AGREGADOS, "manifesto.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def ler_cubo(fonte):
+    arquivo = os.path.join(fonte, PASTA_AGREGADOS, "cubo.parquet")
+    return pd.read_parquet(arquivo) if os.path.exists(arquivo) else None
+
+
+def ler_grades(fonte):
+    arquivo = os.path.join(fonte, PASTA_AGREGADOS, "grades.npz")
+    if not os.path.exists(arquivo):
+        return None
+    chaves = pd.read_parquet(os.path.join(fonte, PASTA_AGREGADOS, "grades_chaves.parquet"))
+    return chaves, sparse.load_npz(arquivo)
+
+
+# ===========================
+# COLUNAS POR VISÃO
+# ===========================
+# Lista de partidas da barra lateral
+COLUNAS_PARTIDAS = ["matchId", "home", "away"]
+
+# Mapas (plot_*): coordenadas + flags usadas nos filtros de cada gráfico
+COLUNAS_MAPAS = [
+    "matchId", "teamId", "playerName", "type", "outcomeType",
+    "x", "y", "endX", "endY",
+    "last_third_entry", "box_entry", "progressive_action", "passFreekick",
+    "passCornerAccurate", "passCornerInaccurate", "passKey", "assist",
+    "dribbleWon", "dribbleLost", "isGoal", "shotOnTarget", "shotOffTarget", "shotOnPost",
+    "isTouch",
+]
+
+# Grades do mapa de calor
+COLUNAS_TOQUES = ["playerName", "teamId", "matchId", "x", "y", "isTouch"]
+
+# Rankings e Comparação: os contadores do cubo + coordenadas para o xT
+COLUNAS_STATS = CUBO_CHAVES + AGG_COLS + ["x", "y", "endX", "endY"]
+
+
+# ===========================
+# SCHEMA COMPACTO
+# ===========================
+# Rótulos repetidos -> category (comparações viram comparações de códigos)
+COLUNAS_CATEGORIA = ["type", "outcomeType", "playerName", "home", "away", "teamName", "confronto"]
+
+# Flags de evento -> bool (1 byte)
+COLUNAS_FLAG = sorted(set(AGG_COLS) | {
+    "last_third_entry", "box_entry", "progressive_action", "passFreekick",
+    "passCornerAccurate", "passCornerInaccurate", "passKey", "assist",
+    "dribbleWon", "dribbleLost", "isGoal", "shotOnTarget", "shotOffTarget", "shotOnPost",
+    "isTouch",
+})
+
+# Coordenadas Opta (0-100) cabem em float32
+COLUNAS_COORD = ["x", "y", "endX", "endY"]
+
+# IDs
+COLUNAS_ID = ["matchId", "teamId"]
+
+
+def memoria_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def aplicar_schema(df):
+    # Converte para os tipos compactos as colunas que existirem no frame
+    tipos = {}
+    for col in df.columns:
+        if col in COLUNAS_CATEGORIA:
+            tipos[col] = "category"
+        elif col in COLUNAS_FLAG:
+            df[col] = df[col].fillna(False)
+            tipos[col] = "bool"
+        elif col in COLUNAS_COORD:
+            tipos[col] = "float32"
+        elif col in COLUNAS_ID:
+            tipos[col] = "int32"
+    return df.astype(tipos)
+
+
+# ===========================
+# FLAGS DOS EVENTOS
+# ===========================
+# Regras únicas para os eventos sintéticos (gerar_eventos.py) e para os
+# JSONs das partidas (coleta.py): cada um só decide de onde vêm os
+# marcadores (sorteio ou qualificadores do feed)
+TIPOS_FINALIZACAO = ["SavedShot", "MissedShots", "ShotOnPost", "Goal"]
+
+# Tipos que não contam como toque na bola (quando o feed não diz)
+TIPOS_SEM_TOQUE = ["Foul", "Challenge"]
+
+
+def na_area(x, y):
+    return (x >= 83) & (y >= 21.1) & (y <= 78.9)
+
+
+def derivar_flags(tipo, sucesso, x, y, end_x, end_y, escanteio, cobranca_falta, passe_chave, assistencia,
+                  toque=None):
+    # {flag: bool por evento} a partir de tipo, resultado e coordenadas
+    # (arrays numpy). Os marcadores (escanteio, ...) valem só nos passes.
+    passe = tipo == "Pass"
+    certo = passe & sucesso
+    escanteio = passe & escanteio
+    gol = tipo == "Goal"
+    dist_ini = np.hypot(100 - x, 50 - y)
+    dist_fim = np.hypot(100 - end_x, 50 - end_y)
+    return {
+        # Passes
+        "passAccurate": certo,
+        "passInaccurate": passe & ~sucesso,
+        "box_entry": certo & na_area(end_x, end_y) & ~na_area(x, y),
+        "progressive_action": passe & (dist_fim <= 0.75 * dist_ini),
+        "last_third_entry": certo & (x < 66.7) & (end_x >= 66.7),
+        "passFreekick": passe & ~escanteio & cobranca_falta,
+        "passCornerAccurate": escanteio & sucesso,
+        "passCornerInaccurate": escanteio & ~sucesso,
+
+        # Ataque (assistência também é passe para finalização)
+        "passKey": passe & (passe_chave | assistencia),
+        "assist": passe & assistencia,
+        "isGoal": gol,
+        "shotsTotal": np.isin(tipo, TIPOS_FINALIZACAO),
+        "shotOnTarget": (tipo == "SavedShot") | gol,
+        "shotOffTarget": tipo == "MissedShots",
+        "shotOnPost": tipo == "ShotOnPost",
+        "dribbleWon": (tipo == "TakeOn") & sucesso,
+        "dribbleLost": (tipo == "TakeOn") & ~sucesso,
+
+        # Defesa (a falta aparece duas vezes no feed: quem sofreu sai como
+        # "Successful", quem cometeu como "Unsuccessful")
+        "tackleWon": (tipo == "Tackle") & sucesso,
+        "tackleLost": (tipo == "Tackle") & ~sucesso,
+        "ballRecovery": tipo == "BallRecovery",
+        "clearanceTotal": tipo == "Clearance",
+        "interceptionAll": tipo == "Interception",
+        "foulCommitted": (tipo == "Foul") & ~sucesso,
+
+        "isTouch": ~np.isin(tipo, TIPOS_SEM_TOQUE) if toque is None else toque,
+    }
+
+
+# ===========================
+# VERSÃO DOS DADOS
+# ===========================
+def versao_dados(fonte, match_id=None):
+    # Entra nas chaves de cache. Com manifesto (ingestão incremental), uma
+    # partida só muda de versão quando a rodada dela é regravada; sem
+    # manifesto, muda sempre que algum arquivo da fonte é trocado ou adicionado.
+    manifesto = ler_manifesto(fonte)
+    if manifesto is not None:
+        if match_id is not None:
+            for rodada, info in manifesto["rodadas"].items():
+                if int(match_id) in info["partidas"]:
+                    return f"r{rodada}-v{info['versao']}"
+        return f"v{manifesto['versao']}"
+
+    if os.path.isfile(fonte):
+        arquivos = [fonte]
+    else:
+        arquivos = sorted(os.path.join(raiz, nome) for raiz, _, nomes in os.walk(fonte)
+                          for nome in nomes if nome.endswith(".parquet"))
+    assinatura = [(arq, os.stat(arq).st_mtime_ns, os.stat(arq).st_size) for arq in arquivos]
+    return hashlib.sha1(repr(assinatura).encode()).hexdigest()[:16]
+
+
+# ===========================
+# LEITURA COM PROJEÇÃO E FILTRO
+# ===========================
+def ler_eventos(fonte, colunas=None):
+    # Lê só as colunas pedidas; os recortes por time, jogador e partida saem
+    # do índice (ler_indice + fatiar), não da leitura.
+    # fonte é a pasta de uma temporada (partições rodada=N) ou um arquivo.
+    dataset = ds.dataset(fonte, format="parquet", partitioning="hive")
+
+    if colunas is not None:
+        colunas = [c for c in colunas if c in dataset.schema.names]
+
+    df = dataset.to_table(columns=colunas).to_pandas()
+
+    antes = memoria_mb(df)
+    df = aplicar_schema(df)
+    logger.info("eventos %s: %.1f MB -> %.1f MB", df.shape, antes, memoria_mb(df))
+    return df
+
+
+# ===========================
+# ÍNDICE DE LINHAS (time, jogador, partida, tipo)
+# ===========================
+INDICE_CHAVES = ["teamId", "playerName", "matchId", "type"]
+
+
+def indexar(df):
+    # Ordena os eventos pelas chaves e guarda, para cada combinação, o
+    # intervalo [inicio, fim) de linhas. Filtro por time, time+jogador ou
+    # time+jogador+partida vira um único fatiamento contíguo.
+    eventos = df.sort_values(INDICE_CHAVES, kind="stable", ignore_index=True)
+    tamanhos = eventos.groupby(INDICE_CHAVES, sort=False, observed=True, dropna=False).size()
+    limites = tamanhos.index.to_frame(index=False)
+    limites["fim"] = tamanhos.cumsum().values
+    limites["inicio"] = limites["fim"] - tamanhos.values
+    return eventos, limites
+
+
+def _linhas(inicio, fim):
+    # Concatena os intervalos [inicio, fim) sem laço em Python
+    tamanhos = fim - inicio
+    deslocamento = np.repeat(inicio - np.cumsum(tamanhos) + tamanhos, tamanhos)
+    return deslocamento + np.arange(tamanhos.sum())
+
+
+def fatiar(eventos, limites, team_id=None, player_name=None, match_id=None, tipos=None):
+    mascara = np.ones(len(limites), dtype=bool)
+    for campo, valor in [("teamId", team_id), ("playerName", player_name), ("matchId", match_id)]:
+        if valor is not None:
+            mascara &= (limites[campo] == valor).values
+    if tipos is not None:
+        mascara &= limites["type"].isin(tipos).values
+
+    sel = limites[mascara]
+    inicio, fim = sel["inicio"].values, sel["fim"].values
+    if len(sel) == 0:
+        return eventos.iloc[0:0]
+    if (inicio[1:] == fim[:-1]).all():
+        # intervalos encostados: fatia sem cópia
+        return eventos.iloc[inicio[0]:fim[-1]]
+    return eventos.iloc[_linhas(inicio, fim)]
+
+
+# ===========================
+# ESPELHO ARROW MAPEADO EM MEMÓRIA
+# ===========================
+# Com DATAFUTEBOL_ESPELHO=/dev/shm/datafutebol (ou outra pasta local), os
+# eventos indexados são gravados uma vez num arquivo Arrow IPC sem
+# compressão e cada processo (sessões do Streamlit, workers atrás do
+# balanceador, pool do render_lote) só mapeia o arquivo: as colunas são
+# views das mesmas páginas do cache do sistema, sem cópia por processo.
+# Sem a variável, tudo continua em memória de cada processo.
+PASTA_ESPELHO = os.environ.get("DATAFUTEBOL_ESPELHO")
+
+# Entra no nome do arquivo: muda quando as colunas do índice mudam
+FORMATO_ESPELHO = 2
+
+
+def _para_arrow(df):
+    # Só tipos de largura fixa, para a leitura virar np.ndarray sem cópia:
+    # category -> códigos + categorias nos metadados, bool -> uint8, e NaN
+    # fica como NaN (não vira nulo do Arrow)
+    campos, colunas = [], []
+    for col in df.columns:
+        serie = df[col]
+        if serie.dtype == object or pd.api.types.is_string_dtype(serie.dtype):
+            serie = serie.astype("category")
+        meta = {}
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            valores = serie.cat.codes.to_numpy()
+            meta["categorias"] = json.dumps(serie.cat.categories.tolist(), ensure_ascii=False)
+        elif serie.dtype == bool:
+            valores = serie.to_numpy().view(np.uint8)
+            meta["tipo"] = "bool"
+        else:
+            valores = serie.to_numpy()
+        arr = pa.array(valores)
+        campos.append(pa.field(col, arr.type, metadata=meta or None))
+        colunas.append(arr)
+    return pa.Table.from_arrays(colunas, schema=pa.schema(campos))
+
+
+def _de_arrow(tabela):
+    colunas = {}
+    for campo, coluna in zip(tabela.schema, tabela.columns):
+        valores = coluna.chunk(0).to_numpy(zero_copy_only=True)
+        meta = campo.metadata or {}
+        if b"categorias" in meta:
+            categorias = pd.Index(json.loads(meta[b"categorias"]))
+            colunas[campo.name] = pd.Categorical.from_codes(valores, categories=categorias, validate=False)
+        elif meta.get(b"tipo") == b"bool":
+            colunas[campo.name] = valores.view(bool)
+        else:
+            colunas[campo.name] = valores
+    return pd.DataFrame(colunas, copy=False)
+
+
+def gravar_ipc(df, caminho):
+    # Grava ao lado e troca de uma vez: quem já mapeou o arquivo antigo
+    # continua lendo ele, quem abrir depois pega o novo inteiro
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    tabela = _para_arrow(df)
+    with pa.OSFile(temporario, "wb") as destino:
+        with pa.ipc.new_file(destino, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+    os.replace(temporario, caminho)
+
+
+def abrir_ipc(caminho):
+    with pa.memory_map(caminho) as origem:
+        return _de_arrow(pa.ipc.open_file(origem).read_all())
+
+
+def caminho_espelho(fonte, versao, team_mapping, pasta=PASTA_ESPELHO):
+    # Um arquivo por fonte + versão dos dados + times.csv
+    chave = hashlib.sha1(os.path.abspath(fonte).encode()).hexdigest()[:12]
+    times = hashlib.sha1(repr(sorted(team_mapping.items())).encode()).hexdigest()[:8]
+    return os.path.join(pasta, f"{chave}-{versao}-{times}-f{FORMATO_ESPELHO}")
+
+
+def gravar_espelho(eventos, limites, caminho):
+    pasta, nome = os.path.split(caminho)
+    os.makedirs(pasta, exist_ok=True)
+    gravar_ipc(limites, f"{caminho}.limites.arrow")
+    gravar_ipc(eventos, f"{caminho}.eventos.arrow")
+    # Versões antigas da mesma fonte saem da pasta (processos que ainda as
+    # mapeiam seguem lendo até fechar)
+    prefixo = nome.split("-")[0] + "-"
+    for antigo in os.listdir(pasta):
+        if antigo.startswith(prefixo) and not antigo.startswith(nome + "."):
+            try:
+                os.remove(os.path.join(pasta, antigo))
+            except OSError:
+                pass
+
+
+def abrir_espelho(caminho):
+    # (eventos, limites) como views do arquivo mapeado; None se não existe
+    if not os.path.exists(f"{caminho}.eventos.arrow"):
+        return None
+    limites = abrir_ipc(f"{caminho}.limites.arrow")
+    eventos = abrir_ipc(f"{caminho}.eventos.arrow")
+    logger.info("espelho %s: %d eventos mapeados", caminho, len(eventos))
+    return eventos, limites
+
+
+def ler_indice(fonte, team_mapping, versao=None, pasta=PASTA_ESPELHO):
+    # Eventos dos mapas (com teamName, posse e receptor) ordenados e indexados. Com pasta de
+    # espelho, o primeiro processo grava o arquivo e todos usam o mapeamento.
+    if pasta:
+        caminho = caminho_espelho(fonte, versao or versao_dados(fonte), team_mapping, pasta)
+        indice = abrir_espelho(caminho)
+        if indice is not None:
+            return indice
+
+    # A ordem cronológica só serve para as posses; depois sai do índice
+    df = ler_eventos(fonte, COLUNAS_MAPAS + COLUNAS_ORDEM)
+    df["teamName"] = df["teamId"].map(team_mapping).astype("category")
+    anexar_posses(df)
+    eventos, limites = indexar(df.drop(columns=COLUNAS_ORDEM, errors="ignore"))
+    if not pasta:
+        return eventos, limites
+    gravar_espelho(eventos, limites, caminho)
+    # Este processo também larga a cópia própria e passa a usar o mapeamento
+    return abrir_espelho(caminho)
@@ -0,0 +1,239 @@
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+# ===========================
+# CONTADORES AGREGADOS
+# ===========================
+# Colunas somadas por jogador em Rankings e Comparação
+AGG_COLS = [
+    # Passes
+    "passAccurate", "passInaccurate", "box_entry", "progressive_action", "last_third_entry",
+
+    # Ataque
+    "isGoal", "assist", "passKey", "passCornerAccurate", "passCornerInaccurate",
+    "shotsTotal", "shotOnTarget", "shotOffTarget", "shotOnPost", "dribbleWon", "dribbleLost",
+
+    # Defesa
+    "tackleWon", "tackleLost", "ballRecovery", "clearanceTotal", "interceptionAll", "foulCommitted",
+]
+
+CUBO_CHAVES = ["playerName", "teamId", "matchId"]
+
+# Valores somados além dos contadores (xt.py), quando os eventos os têm
+VALOR_COLS = ["xT"]
+
+# Estatísticas por jogo disponíveis no radar da Comparação
+ESTATISTICAS_RADAR = [
+    "Passes Totais", "Aproveitamento nos Passes", "Passes para a Área",
+    "Passes Progressivos", "Passes para o Terço Final", "Gols",
+    "Assistências", "Chances Criadas", "Taxa de Conversão",
+    "Aproveitamento nos Dribles", "Desarmes", "Interceptações",
+    "Rebatidas", "Bolas Recuperadas"
+]
+
+
+# ===========================
+# CUBO JOGADOR x PARTIDA
+# ===========================
+def construir_cubo(df):
+    # Uma linha por (jogador, time, partida) com os contadores já somados.
+    # Rankings e Comparação somam este cubo (milhares de linhas) em vez de
+    # varrer todos os eventos da temporada a cada rerun.
+    grupos = df.groupby(CUBO_CHAVES, sort=False, observed=True)
+    cubo = grupos[AGG_COLS].sum().astype("int32")
+    for col in VALOR_COLS:
+        if col in df:
+            cubo[col] = grupos[col].sum().astype("float32")
+    cubo["eventos"] = grupos.size()
+    return cubo.reset_index()
+
+
+def agregar_jogadores(cubo, team_mapping, match_id=None):
+    # Totais por (jogador, time) + número de jogos, opcionalmente só de uma partida
+    if match_id is not None:
+        cubo = cubo[cubo["matchId"] == match_id]
+
+    cubo = cubo.assign(teamName=cubo["teamId"].map(team_mapping))
+    grupos = cubo.groupby(["playerName", "teamName"], observed=True)
+    stats = grupos[AGG_COLS + [col for col in VALOR_COLS if col in cubo]].sum()
+    # Cada linha do cubo é uma partida distinta do jogador
+    stats["Jogos"] = grupos.size()
+    return stats.reset_index()
+
+
+# ===========================
+# MÉDIAS POR JOGO E PERCENTIS
+# ===========================
+def por_jogo(stats):
+    # Calcular médias por jogo
+    stats_per_game = stats.set_index(["playerName", "teamName"])[AGG_COLS].div(stats["Jogos"].values, axis=0).reset_index()
+
+    # Calcular as estatísticas específicas com base nas médias
+    stats_per_game["Passes Totais"] = stats_per_game["passAccurate"] + stats_per_game["passInaccurate"]
+    stats_per_game["Aproveitamento nos Passes"] = np.where(stats_per_game["Passes Totais"] > 0, (stats_per_game["passAccurate"] / stats_per_game["Passes Totais"] * 100).round(1), 0)
+    stats_per_game["Passes para a Área"] = stats_per_game["box_entry"]
+    stats_per_game["Passes Progressivos"] = stats_per_game["progressive_action"]
+    stats_per_game["Passes para o Terço Final"] = stats_per_game["last_third_entry"]
+    stats_per_game["Gols"] = stats_per_game["isGoal"]
+    stats_per_game["Assistências"] = stats_per_game["assist"]
+    stats_per_game["Chances Criadas"] = stats_per_game["passKey"]
+    stats_per_game["Taxa de Conversão"] = np.where(stats_per_game["shotsTotal"] > 0, (stats_per_game["isGoal"] / stats_per_game["shotsTotal"] * 100).round(1), 0)
+    stats_per_game["Aproveitamento nos Dribles"] = np.where((stats_per_game["dribbleWon"] + stats_per_game["dribbleLost"]) > 0, (stats_per_game["dribbleWon"] / (stats_per_game["dribbleWon"] + stats_per_game["dribbleLost"]) * 100).round(1), 0)
+    stats_per_game["Desarmes"] = stats_per_game["tackleWon"]
+    stats_per_game["Interceptações"] = stats_per_game["interceptionAll"]
+    stats_per_game["Rebatidas"] = stats_per_game["clearanceTotal"]
+    stats_per_game["Bolas Recuperadas"] = stats_per_game["ballRecovery"]
+    stats_per_game["Jogos"] = stats["Jogos"].values
+    return stats_per_game
+
+
+def matriz_percentis(stats_per_game, colunas=ESTATISTICAS_RADAR):
+    # Percentil de cada jogador contra TODOS os jogadores, uma ordenação por
+    # coluna (rank médio / nº de valores, como o rankdata de antes).
+    # Montar o radar vira só buscar as linhas dos jogadores escolhidos.
+    valores = stats_per_game[colunas]
+    percentis = valores.rank(method="average") / valores.count()
+    return pd.concat([stats_per_game[["playerName", "teamName"]], percentis], axis=1)
+
+
+# ===========================
+# JOGADORES SEMELHANTES
+# ===========================
+def indexar_semelhantes(stats_per_game, colunas=ESTATISTICAS_RADAR):
+    # Médias por jogo padronizadas (z-score por estatística, para que gols e
+    # passes pesem igual na distância) numa KD-tree, montada uma vez por
+    # versão dos dados; cada busca depois é uma consulta de vizinhos
+    valores = stats_per_game[colunas].to_numpy(dtype="float64")
+    desvio = valores.std(axis=0)
+    vetores = (valores - valores.mean(axis=0)) / np.where(desvio > 0, desvio, 1)
+    jogadores = stats_per_game[["playerName", "teamName", "Jogos"]].reset_index(drop=True)
+    return cKDTree(vetores), vetores, jogadores
+
+
+def semelhantes(indice, player_name, team_name, k=10, times=None, min_jogos=1):
+    # Os k jogadores mais próximos que passam nos filtros, do mais parecido
+    # ao menos; a consulta pede mais vizinhos até sobrarem k após filtrar
+    arvore, vetores, jogadores = indice
+    linha = np.flatnonzero((jogadores["playerName"] == player_name).to_numpy()
+                           & (jogadores["teamName"] == team_name).to_numpy())
+    if len(linha) == 0:
+        return jogadores.iloc[:0].assign(Distância=np.empty(0))
+
+    permitido = jogadores["Jogos"].to_numpy() >= min_jogos
+    if times:
+        permitido &= jogadores["teamName"].isin(times).to_numpy()
+    permitido[linha[0]] = False
+
+    total = len(jogadores)
+    consulta = min(total, 4 * (k + 1))
+    while True:
+        distancias, posicoes = arvore.query(vetores[linha[0]], k=consulta)
+        distancias, posicoes = np.atleast_1d(distancias), np.atleast_1d(posicoes)
+        ok = permitido[posicoes]
+        if ok.sum() >= k or consulta == total:
+            break
+        consulta = min(total, consulta * 4)
+    return jogadores.iloc[posicoes[ok][:k]].assign(Distância=distancias[ok][:k].round(2))
+
+
+# ===========================
+# RANKINGS
+# ===========================
+# Colunas de cada tabela dos Rankings (além de jogador, time e jogos)
+COLUNAS_RANKING = {
+    "🎯 Passes": [
+        "Passes Totais", "Passes Certos", "Passes Errados", "Aproveitamento nos Passes",
+        "Passes para a Área", "Passes Progressivos", "Passes para o Terço Final",
+    ],
+    "⚡ Ataque": [
+        "Gols", "Assistências", "Chances Criadas", "xT",
+        "Escanteios Certos", "Escanteios Errados", "Acerto nos Escanteios",
+        "Finalizações", "Finalizações no Alvo", "Finalizações pra Fora", "Finalizações na Trave",
+        "Taxa de Conversão", "Aproveitamento nas Finalizações",
+        "Dribles Totais", "Dribles Corretos", "Dribles Errados", "Aproveitamento nos Dribles",
+    ],
+    "🛡️ Defesa": [
+        "Desarmes", "Bolas Recuperadas", "Rebatidas", "Interceptações", "Faltas",
+    ],
+}
+
+# Contagens divididas pelo número de jogos no modo "Por jogo"
+CONTAGENS_RANKING = [
+    "Passes Totais", "Passes Certos", "Passes Errados", "Passes para a Área",
+    "Passes Progressivos", "Passes para o Terço Final",
+    "Gols", "Assistências", "Chances Criadas",
+    "Escanteios Certos", "Escanteios Errados",
+    "Finalizações", "Finalizações no Alvo", "Finalizações pra Fora", "Finalizações na Trave",
+    "Dribles Totais", "Dribles Corretos", "Dribles Errados",
+    "Desarmes", "Bolas Recuperadas", "Rebatidas", "Interceptações", "Faltas"
+]
+
+
+def tabela_rankings(stats, modo="Total"):
+    # Métricas das tabelas de Rankings a partir dos totais por jogador
+    # contar jogos distintos por jogador (somando todos os times dele)
+    stats["Jogos"] = stats.groupby("playerName")["Jogos"].transform("sum")
+
+    # calcular derivados
+    stats["Passes Totais"] = stats["passAccurate"] + stats["passInaccurate"]
+    stats["Passes Certos"] = stats["passAccurate"]
+    stats["Passes Errados"] = stats["passInaccurate"]
+    stats["Aproveitamento nos Passes"] = (stats["passAccurate"] / stats["Passes Totais"] * 100).round(1)
+
+    stats["Passes para a Área"] = stats["box_entry"]
+    stats["Passes Progressivos"] = stats["progressive_action"]
+    stats["Passes para o Terço Final"] = stats["last_third_entry"]
+
+    stats["Gols"] = stats["isGoal"]
+    stats["Assistências"] = stats["assist"]
+    stats["Chances Criadas"] = stats["passKey"]
+    # Ameaça esperada gerada (soma do xT dos passes); vazio em cubos antigos, sem a coluna
+    stats["xT"] = stats["xT"].astype("float64").round(3) if "xT" in stats else np.nan
+
+    stats["Escanteios Certos"] = stats["passCornerAccurate"]
+    stats["Escanteios Errados"] = stats["passCornerInaccurate"]
+    stats["Acerto nos Escanteios"] = (stats["passCornerAccurate"] / (stats["passCornerAccurate"] + stats["passCornerInaccurate"]) * 100).round(1)
+
+    stats["Finalizações"] = stats["shotsTotal"]
+    stats["Finalizações no Alvo"] = stats["shotOnTarget"]
+    stats["Finalizações pra Fora"] = stats["shotOffTarget"]
+    stats["Finalizações na Trave"] = stats["shotOnPost"]
+    stats["Taxa de Conversão"] = (stats["isGoal"] / stats["shotsTotal"] * 100).round(1)
+    stats["Aproveitamento nas Finalizações"] = (stats["shotOnTarget"] / stats["shotsTotal"] * 100).round(1)
+
+    stats["Dribles Totais"] = stats["dribbleWon"] + stats["dribbleLost"]
+    stats["Dribles Corretos"] = stats["dribbleWon"]
+    stats["Dribles Errados"] = stats["dribbleLost"]
+    stats["Aproveitamento nos Dribles"] = (stats["dribbleWon"] / stats["Dribles Totais"] * 100).round(1)
+
+    stats["Desarmes"] = stats["tackleWon"] + stats["tackleLost"]
+    stats["Bolas Recuperadas"] = stats["ballRecovery"]
+    stats["Rebatidas"] = stats["clearanceTotal"]
+    stats["Interceptações"] = stats["interceptionAll"]
+    stats["Faltas"] = stats["foulCommitted"]
+
+    # AJUSTE TOTAL vs POR JOGO
+    if modo == "Por jogo":
+        stats[CONTAGENS_RANKING] = stats[CONTAGENS_RANKING].div(stats["Jogos"], axis=0).round(2)
+        stats["xT"] = (stats["xT"] / stats["Jogos"]).round(3)
+
+    colunas = [col for grupo in COLUNAS_RANKING.values() for col in grupo]
+    return stats[["playerName", "teamName", "Jogos"] + colunas].reset_index(drop=True)
+
+
+def top_n(tabela, metrica, n, inicio=0, decrescente=True):
+    # Linhas [inicio, inicio + n) da tabela ordenada pela métrica, sem
+    # ordenar a tabela inteira: seleção parcial das inicio + n primeiras e
+    # ordenação só delas. Empates pela ordem das linhas (páginas estáveis);
+    # sem valor (divisão por zero) vai para o fim.
+    chave = tabela[metrica].to_numpy(dtype="float64")
+    chave = -chave if decrescente else chave.copy()
+    chave[np.isnan(chave)] = np.inf
+    k = min(inicio + n, len(chave))
+    if k <= inicio:
+        return tabela.iloc[:0]
+    limiar = np.partition(chave, k - 1)[k - 1]
+    candidatos = np.flatnonzero(chave <= limiar)
+    ordem = candidatos[np.lexsort((candidatos, chave[candidatos]))]
+    return tabela.iloc[ordem[inicio:k]]
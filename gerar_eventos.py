@@ -0,0 +1,143 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from dados import PASTA_EVENTOS, TIPOS_FINALIZACAO, caminho_dados, derivar_flags, ler_times
+
+# ===========================
+# EVENTOS SINTÉTICOS (schema do BRA25)
+# ===========================
+# python gerar_eventos.py --escala 10 --competicao SIN --temporada 10x
+# Uma escala 1 = uma temporada de pontos corridos (20 times, 38 rodadas,
+# 380 partidas, ~1700 eventos por partida). Escala 10/100 repete o
+# calendário em mais rodadas. Cada rodada é gravada na hora, então a
+# memória não cresce com a escala.
+
+EVENTOS_POR_PARTIDA = 1700
+JOGADORES_POR_ELENCO = 25
+
+TIPOS = np.array([
+    "Pass", "BallRecovery", "Tackle", "Interception", "Clearance", "Foul", "TakeOn",
+    "Aerial", "BallTouch", "Dispossessed", "SavedShot", "MissedShots", "ShotOnPost",
+    "Goal", "KeeperPickup", "BlockedPass", "Challenge",
+])
+PROB_TIPOS = np.array([
+    0.56, 0.05, 0.03, 0.02, 0.03, 0.02, 0.03,
+    0.04, 0.06, 0.02, 0.008, 0.01, 0.001,
+    0.0015, 0.006, 0.04, 0.042,
+])
+PROB_TIPOS = PROB_TIPOS / PROB_TIPOS.sum()
+
+# Chance de sucesso por tipo (o resto é "Unsuccessful"); a falta gerada é
+# sempre a de quem cometeu, que no feed sai como "Unsuccessful"
+SUCESSO = {"Pass": 0.8, "TakeOn": 0.5, "Tackle": 0.7, "Aerial": 0.5, "Challenge": 0.0, "Foul": 0.0}
+
+
+def calendario(times):
+    # Pontos corridos (método do círculo): 38 rodadas com 10 jogos
+    times = list(times)
+    n = len(times)
+    rodadas = []
+    for r in range(n - 1):
+        jogos = [(times[i], times[n - 1 - i]) for i in range(n // 2)]
+        rodadas.append(jogos if r % 2 == 0 else [(fora, casa) for casa, fora in jogos])
+        times = [times[0], times[-1]] + times[1:-1]
+    return rodadas + [[(fora, casa) for casa, fora in jogos] for jogos in rodadas]
+
+
+def gerar_partida(rng, match_id, casa, fora, team_mapping):
+    n = int(rng.normal(EVENTOS_POR_PARTIDA, 150))
+    team_id = np.where(rng.random(n) < 0.52, casa, fora)
+
+    # 11 titulares com mais ações + 3 reservas
+    escalados = rng.choice(JOGADORES_POR_ELENCO, size=14, replace=False)
+    pesos = np.r_[np.full(11, 1.0), np.full(3, 0.3)]
+    numero = escalados[rng.choice(14, size=n, p=pesos / pesos.sum())]
+    player_id = team_id * 100 + numero
+    nome_time = pd.Series(team_id).map(team_mapping).fillna("Time").to_numpy()
+    player_name = nome_time + " " + numero.astype(str)
+
+    tipo = rng.choice(TIPOS, size=n, p=PROB_TIPOS)
+    chance = pd.Series(tipo).map(SUCESSO).fillna(1.0).to_numpy()
+    sucesso = rng.random(n) < chance
+
+    x = np.clip(rng.beta(2, 2, n) * 100, 0, 100)
+    y = np.clip(rng.normal(50, 25, n), 0, 100)
+    chute = np.isin(tipo, TIPOS_FINALIZACAO)
+    x[chute] = rng.uniform(72, 99, chute.sum())
+    y[chute] = np.clip(rng.normal(50, 12, chute.sum()), 0, 100)
+
+    passe = tipo == "Pass"
+    escanteio = passe & (rng.random(n) < 0.012)
+    x[escanteio] = 99.5
+    y[escanteio] = np.where(rng.random(escanteio.sum()) < 0.5, 0.5, 99.5)
+    end_x = np.where(passe, np.clip(x + rng.normal(6, 18, n), 0, 100), np.nan)
+    end_y = np.where(passe, np.clip(y + rng.normal(0, 20, n), 0, 100), np.nan)
+    end_x[escanteio] = rng.uniform(85, 99, escanteio.sum())
+    end_y[escanteio] = rng.uniform(30, 70, escanteio.sum())
+
+    # Marcadores sorteados (no feed real vêm dos qualificadores)
+    chave = passe & sucesso & (end_x > 70) & (rng.random(n) < 0.05)
+    cobranca_falta = rng.random(n) < 0.03
+    assistencia = chave & (rng.random(n) < 0.1)
+
+    minuto = np.sort(rng.integers(0, 95, n))
+    eventos = pd.DataFrame({
+        "matchId": match_id,
+        "eventId": np.arange(n),
+        "minute": minuto,
+        "second": rng.integers(0, 60, n),
+        "teamId": team_id,
+        "playerId": player_id,
+        "playerName": player_name,
+        "type": tipo,
+        "outcomeType": np.where(sucesso, "Successful", "Unsuccessful"),
+        "x": x, "y": y, "endX": end_x, "endY": end_y,
+        "home": team_mapping.get(casa, str(casa)),
+        "away": team_mapping.get(fora, str(fora)),
+        **derivar_flags(tipo, sucesso, x, y, end_x, end_y, escanteio, cobranca_falta, chave, assistencia),
+    })
+    return eventos
+
+
+def gerar_rodadas(escala=1, semente=0, team_mapping=None):
+    # Gera (rodada, eventos) uma rodada por vez
+    team_mapping = ler_times() if team_mapping is None else team_mapping
+    rng = np.random.default_rng(semente)
+    rodadas = calendario(sorted(team_mapping))
+    match_id = 1_000_000
+    for volta in range(escala):
+        for r, jogos in enumerate(rodadas, start=1):
+            partidas = []
+            for casa, fora in jogos:
+                partidas.append(gerar_partida(rng, match_id, casa, fora, team_mapping))
+                match_id += 1
+            yield volta * len(rodadas) + r, pd.concat(partidas, ignore_index=True)
+
+
+def gravar_base(fonte, escala=1, semente=0):
+    # Pasta de temporada no layout particionado (rodada=N/part-0.parquet)
+    total = 0
+    for rodada, eventos in gerar_rodadas(escala, semente):
+        pasta = os.path.join(fonte, f"rodada={rodada}")
+        os.makedirs(pasta, exist_ok=True)
+        eventos.to_parquet(os.path.join(pasta, "part-0.parquet"), index=False, row_group_size=50_000)
+        total += len(eventos)
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera eventos sintéticos no schema do BRA25")
+    parser.add_argument("--escala", type=int, default=1, help="temporadas de 380 partidas")
+    parser.add_argument("--competicao", default="SIN")
+    parser.add_argument("--temporada", default=None, help="padrão: <escala>x")
+    parser.add_argument("--pasta", default=caminho_dados(PASTA_EVENTOS))
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    temporada = args.temporada or f"{args.escala}x"
+    fonte = os.path.join(args.pasta, f"competicao={args.competicao}", f"temporada={temporada}")
+    total = gravar_base(fonte, args.escala, args.semente)
+    print(f"{fonte}: {total} eventos")
@@ -0,0 +1,85 @@
+import numpy as np
+from scipy import sparse
+from scipy.ndimage import gaussian_filter
+
+# ===========================
+# GRADE DO CAMPO (Opta 100x100)
+# ===========================
+# ~1 célula por metro num campo de 105x68
+NX, NY = 105, 68
+
+GRADE_CHAVES = ["playerName", "teamId", "matchId"]
+
+
+def _celulas(x, y):
+    ix = np.clip((np.asarray(x, dtype="float64") / 100 * NX).astype("int64"), 0, NX - 1)
+    iy = np.clip((np.asarray(y, dtype="float64") / 100 * NY).astype("int64"), 0, NY - 1)
+    return ix * NY + iy
+
+
+def grade_toques(x, y):
+    # Contagem de toques por célula direto das coordenadas (sem as NaN,
+    # como em construir_grades)
+    x, y = np.asarray(x, dtype="float64"), np.asarray(y, dtype="float64")
+    validos = np.isfinite(x) & np.isfinite(y)
+    return np.bincount(_celulas(x[validos], y[validos]), minlength=NX * NY).reshape(NX, NY).astype("float64")
+
+
+# ===========================
+# GRADES POR JOGADOR x PARTIDA
+# ===========================
+def construir_grades(df):
+    # Matriz esparsa (jogador x time x partida) x célula com os toques.
+    # O mapa de qualquer filtro (partida, time, jogador, temporada) é a soma
+    # das linhas que batem com ele.
+    toques = df[df["isTouch"] & df["x"].notna() & df["y"].notna()]
+    codigos, chaves = toques.set_index(GRADE_CHAVES).index.factorize()
+    grades = sparse.coo_matrix(
+        (np.ones(len(toques), dtype="int32"), (codigos, _celulas(toques["x"], toques["y"]))),
+        shape=(len(chaves), NX * NY),
+    ).tocsr()
+    return chaves.set_names(GRADE_CHAVES).to_frame(index=False), grades
+
+
+def somar_grades(grades, mascara):
+    return np.asarray(grades[np.flatnonzero(mascara)].sum(axis=0), dtype="float64").reshape(NX, NY)
+
+
+# ===========================
+# SUAVIZAÇÃO E DESENHO
+# ===========================
+def suavizar(grade):
+    # Gaussiana separável com a largura da regra de Scott, a mesma que o
+    # kdeplot (bw_adjust=1) usa, calculada a partir da própria grade
+    n = grade.sum()
+    if n < 2:
+        return grade
+    sigmas = []
+    for eixo, celulas in [(1, NX), (0, NY)]:
+        marginal = grade.sum(axis=eixo)
+        centros = np.arange(celulas) + 0.5
+        media = (marginal * centros).sum() / n
+        desvio = np.sqrt((marginal * (centros - media) ** 2).sum() / n)
+        sigmas.append(max(desvio * n ** (-1 / 6), 1.0))
+    return gaussian_filter(grade, sigma=sigmas, mode="constant")
+
+
+def niveis_proporcao(densidade):
+    # Converte densidade na fração de massa abaixo dela (como os níveis
+    # iso-proporção do seaborn); abaixo de 5% fica transparente
+    plano = densidade.ravel()
+    ordem = np.argsort(plano)
+    acumulado = np.cumsum(plano[ordem])
+    niveis = np.empty_like(plano)
+    niveis[ordem] = acumulado / acumulado[-1] if acumulado[-1] > 0 else 0
+    niveis = niveis.reshape(densidade.shape)
+    return np.ma.masked_less(niveis, 0.05)
+
+
+def desenhar_heatmap(ax, grade, cmap="Reds", alpha=0.7):
+    limites = ax.get_xlim(), ax.get_ylim()
+    ax.imshow(niveis_proporcao(suavizar(grade)).T, extent=(0, 100, 0, 100), origin="lower",
+              cmap=cmap, alpha=alpha, vmin=0.05, vmax=1, interpolation="bilinear",
+              aspect=ax.get_aspect(), zorder=1)
+    ax.set_xlim(*limites[0])
+    ax.set_ylim(*limites[1])
@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from dados import (
+    COLUNAS_STATS, COLUNAS_TOQUES, PASTA_AGREGADOS, PASTA_EVENTOS,
+    aplicar_schema, caminho_dados, ler_eventos, ler_manifesto, ler_cubo, ler_grades
+)
+from estatisticas import CUBO_CHAVES, construir_cubo
+from heatmap import construir_grades
+from xt import COLUNAS_XT, anexar_xt
+
+# ===========================
+# AGREGADOS GUARDADOS POR TEMPORADA
+# ===========================
+def _caminho(fonte, nome):
+    return os.path.join(fonte, PASTA_AGREGADOS, nome)
+
+
+def _gravar(fonte, manifesto, cubo, chaves, grades):
+    # Tudo vai primeiro para arquivos .tmp na mesma pasta e só então troca de
+    # nome (os.replace é atômico): um app subindo no meio da ingestão nunca
+    # lê um parquet/npz pela metade. As trocas ficam todas no fim, chaves e
+    # grades lado a lado, e o manifesto por último: quem lê a versão nova
+    # já encontra os agregados novos.
+    os.makedirs(os.path.join(fonte, PASTA_AGREGADOS), exist_ok=True)
+    temporarios = {nome: _caminho(fonte, f"{nome}.tmp") for nome in
+                   ["cubo.parquet", "grades_chaves.parquet", "grades.npz", "manifesto.json"]}
+    cubo.to_parquet(temporarios["cubo.parquet"], index=False)
+    chaves.to_parquet(temporarios["grades_chaves.parquet"], index=False)
+    with open(temporarios["grades.npz"], "wb") as f:
+        sparse.save_npz(f, grades)
+    with open(temporarios["manifesto.json"], "w", encoding="utf-8") as f:
+        json.dump(manifesto, f)
+    for nome, tmp in temporarios.items():
+        os.replace(tmp, _caminho(fonte, nome))
+
+
+def reconstruir_agregados(fonte):
+    # Caminho completo (primeira vez ou reparo): varre todos os eventos
+    eventos = ler_eventos(fonte, sorted(set(COLUNAS_STATS) | set(COLUNAS_TOQUES) | {"rodada"}))
+    rodadas = {
+        str(rodada): {"versao": 1, "partidas": sorted(int(m) for m in partidas.unique())}
+        for rodada, partidas in eventos.groupby("rodada", observed=True)["matchId"]
+    }
+    chaves, grades = construir_grades(eventos)
+    anexar_xt(eventos)
+    manifesto = {"versao": 1, "rodadas": rodadas}
+    _gravar(fonte, manifesto, construir_cubo(eventos), chaves, grades)
+    return manifesto
+
+
+def _atualizar_xt(fonte, cubo):
+    # A grade de xT é ajustada na temporada inteira, então uma rodada nova
+    # muda o valor das ações de todas as partidas: a coluna xT do cubo é
+    # refeita por completo (só as colunas do xT são lidas)
+    eventos = ler_eventos(fonte, CUBO_CHAVES + COLUNAS_XT)
+    anexar_xt(eventos)
+    xt = eventos.groupby(CUBO_CHAVES, observed=True, as_index=False)["xT"].sum()
+    cubo = cubo.drop(columns="xT", errors="ignore").merge(xt, on=CUBO_CHAVES, how="left")
+    cubo["xT"] = cubo["xT"].fillna(0).astype("float32")
+    return cubo
+
+
+# ===========================
+# NOVA RODADA
+# ===========================
+def adicionar_rodada(fonte, rodada, eventos, hashes=None):
+    # Grava os eventos da rodada como partição própria e aplica só o delta
+    # nos agregados: as linhas das partidas da rodada (do cubo e das grades)
+    # são trocadas, o resto fica como estava. Reenviar uma rodada corrigida
+    # substitui a anterior. hashes ({hash do arquivo: matchId}, coleta.py)
+    # fica no manifesto para a próxima coleta pular o que não mudou.
+    manifesto = ler_manifesto(fonte)
+    if manifesto is None:
+        existentes = os.path.isdir(fonte) and any(n.startswith("rodada=") for n in os.listdir(fonte))
+        manifesto = reconstruir_agregados(fonte) if existentes else {"versao": 0, "rodadas": {}}
+
+    pasta = os.path.join(fonte, f"rodada={rodada}")
+    os.makedirs(pasta, exist_ok=True)
+    # Como nos agregados: .tmp e os.replace, para quem lê a partição (o app,
+    # a coleta reenviando a rodada) nunca pegar um parquet pela metade. O
+    # ponto no começo do nome deixa o .tmp fora do dataset do Arrow.
+    destino = os.path.join(pasta, "part-0.parquet")
+    tmp = os.path.join(pasta, ".part-0.parquet.tmp")
+    eventos.to_parquet(tmp, index=False)
+    os.replace(tmp, destino)
+
+    eventos = aplicar_schema(eventos.copy())
+    antigas = manifesto["rodadas"].get(str(rodada), {}).get("partidas", [])
+    novas = sorted(int(m) for m in eventos["matchId"].unique())
+    trocar = set(antigas) | set(novas)
+
+    cubo = ler_cubo(fonte)
+    delta_cubo = construir_cubo(eventos)
+    if cubo is not None:
+        cubo = pd.concat([cubo[~cubo["matchId"].isin(trocar)], delta_cubo], ignore_index=True)
+    else:
+        cubo = delta_cubo
+    cubo = _atualizar_xt(fonte, cubo)
+
+    delta_chaves, delta_grades = construir_grades(eventos)
+    guardadas = ler_grades(fonte)
+    if guardadas is not None:
+        chaves, grades = guardadas
+        manter = ~chaves["matchId"].isin(trocar).values
+        chaves = pd.concat([chaves[manter], delta_chaves], ignore_index=True)
+        grades = sparse.vstack([grades[np.flatnonzero(manter)], delta_grades]).tocsr()
+    else:
+        chaves, grades = delta_chaves, delta_grades
+
+    manifesto["versao"] += 1
+    manifesto["rodadas"][str(rodada)] = {"versao": manifesto["versao"], "partidas": novas}
+    if hashes is not None:
+        manifesto["rodadas"][str(rodada)]["hashes"] = hashes
+    _gravar(fonte, manifesto, cubo, chaves, grades)
+    return manifesto
+
+
+# ===========================
+# LINHA DE COMANDO
+# ===========================
+# python ingestao.py rodada12.parquet --competicao BRA --temporada 2025 --rodada 12
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adiciona uma rodada à base particionada")
+    parser.add_argument("arquivo", help="parquet com os eventos da rodada")
+    parser.add_argument("--competicao", required=True)
+    parser.add_argument("--temporada", required=True)
+    parser.add_argument("--rodada", required=True, type=int)
+    parser.add_argument("--pasta", default=caminho_dados(PASTA_EVENTOS))
+    args = parser.parse_args()
+
+    fonte = os.path.join(args.pasta, f"competicao={args.competicao}", f"temporada={args.temporada}")
+    manifesto = adicionar_rodada(fonte, args.rodada, pd.read_parquet(args.arquivo))
+    print(f"{fonte}: rodada {args.rodada} gravada, versão {manifesto['versao']}")
@@ -0,0 +1,116 @@
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# ===========================
+# MEDIÇÃO POR RERUN
+# ===========================
+# iniciar_rerun(menu=...) no começo do script, etapa("...") em volta das
+# partes caras e finalizar_rerun() no fim: uma linha JSON por rerun no log.
+# Sem rerun ativo (scripts de lote, benchmark) as etapas não fazem nada.
+# Cada sessão do Streamlit roda o script na sua thread, daí o threading.local.
+_local = threading.local()
+
+_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_mb():
+    # Memória residente do processo (Linux); None onde não houver /proc
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGINA / 1024 ** 2
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def iniciar_rerun(**tags):
+    _local.rerun = {
+        "tags": dict(tags),
+        "etapas": [],
+        "nivel": 0,
+        "inicio": time.perf_counter(),
+        "rss_inicio": rss_mb(),
+    }
+
+
+def marcar(**tags):
+    # Tags conhecidas só no meio do script (gráfico, time, jogador...)
+    rerun = getattr(_local, "rerun", None)
+    if rerun is not None:
+        rerun["tags"].update(tags)
+
+
+@contextmanager
+def etapa(nome):
+    rerun = getattr(_local, "rerun", None)
+    if rerun is None:
+        yield
+        return
+    registro = {"etapa": nome, "nivel": rerun["nivel"]}
+    rerun["etapas"].append(registro)  # na ordem de início, para mostrar aninhado
+    rerun["nivel"] += 1
+    rss = rss_mb()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registro["ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+        if rss is not None:
+            registro["rss_mb"] = round(rss_mb() - rss, 1)
+        rerun["nivel"] -= 1
+
+
+def finalizar_rerun():
+    rerun = getattr(_local, "rerun", None)
+    if rerun is None:
+        return None
+    _local.rerun = None
+    rss = rss_mb()
+    resumo = {
+        "tags": rerun["tags"],
+        "total_ms": round((time.perf_counter() - rerun["inicio"]) * 1000, 1),
+        "rss_mb": round(rss, 1) if rss is not None else None,
+        "rss_delta_mb": round(rss - rerun["rss_inicio"], 1) if rss is not None else None,
+        "etapas": rerun["etapas"],
+    }
+    logger.info(json.dumps(resumo, ensure_ascii=False, default=str))
+    return resumo
+
+
+# ===========================
+# PROFILER SOB DEMANDA
+# ===========================
+def iniciar_perfil():
+    perfil = cProfile.Profile()
+    perfil.enable()
+    return perfil
+
+
+@contextmanager
+def medir_rerun(perfil=False, **tags):
+    # iniciar_rerun/finalizar_rerun em volta do script inteiro: com st.stop()
+    # (que levanta uma exceção) ou um erro no meio da página o profiler é
+    # desligado e a linha do log sai do mesmo jeito
+    medicao = {"perfil": iniciar_perfil() if perfil else None, "resumo": None}
+    iniciar_rerun(**tags)
+    try:
+        yield medicao
+    finally:
+        if medicao["perfil"] is not None:
+            medicao["perfil"].disable()
+        medicao["resumo"] = finalizar_rerun()
+
+
+def resumo_perfil(perfil, linhas=30):
+    perfil.disable()
+    buf = io.StringIO()
+    pstats.Stats(perfil, stream=buf).sort_stats("cumulative").print_stats(linhas)
+    return buf.getvalue()
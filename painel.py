@@ -0,0 +1,114 @@
+import matplotlib
+matplotlib.use("Agg")  # workers sem janela
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import types
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from cache_figuras import chave_figura, figura_para_png
+from dados import abrir_ipc, gravar_ipc
+from plots import plot_functions
+
+# ===========================
+# PAINEL (VÁRIOS GRÁFICOS DE UMA VEZ)
+# ===========================
+# Os gráficos que não estão no cache são desenhados em paralelo, todos a
+# partir da mesma fatia de eventos, e devolvidos na ordem em que ficam
+# prontos para o app ir preenchendo a grade.
+# DATAFUTEBOL_PAINEL_PROCESSOS=N: N processos por servidor (padrão: 2, ou
+# 1 numa máquina de 1 CPU); com 1, uma thread só, que desenha os gráficos
+# um de cada vez (o pyplot não aguenta várias threads desenhando juntas).
+PROCESSOS_PAINEL = int(os.environ.get("DATAFUTEBOL_PAINEL_PROCESSOS", min(2, os.cpu_count() or 1)))
+
+# A fatia vai para os processos uma vez por painel, num arquivo Arrow que
+# cada processo mapeia (em memória compartilhada quando há /dev/shm)
+PASTA_PAINEL = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+# Troca do __main__ durante a subida dos processos (ver criar_pool)
+_lock_main = threading.Lock()
+
+# Em cada processo: a fatia do painel atual ({arquivo: eventos})
+_fatia = {}
+
+
+def _aquecer():
+    return os.getpid()
+
+
+def _eventos(arquivo):
+    if arquivo not in _fatia:
+        _fatia.clear()  # o painel anterior não volta
+        _fatia[arquivo] = abrir_ipc(arquivo)
+    return _fatia[arquivo]
+
+
+def _renderizar(tipo, data, selected, extras):
+    # data é a própria fatia (threads) ou o arquivo dela (processos)
+    if isinstance(data, str):
+        data = _eventos(data)
+    return figura_para_png(plot_functions[tipo](data, selected, *extras))
+
+
+def criar_pool(processos=PROCESSOS_PAINEL):
+    if processos <= 1:
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="painel")
+    # forkserver: o servidor do Streamlit tem várias threads, e um fork
+    # direto herdaria locks presos por elas
+    pool = ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context("forkserver"))
+    # Os processos sobem todos aqui, com um __main__ vazio: no Streamlit o
+    # __main__ é o próprio app.py, que cada worker importaria e rodaria
+    # inteiro. A troca é global, então fica sob um lock e dura só os
+    # submits (o app cria um pool por servidor, no st.cache_resource).
+    # A primeira tarefa já importa os gráficos (plots.py).
+    with _lock_main:
+        principal = sys.modules["__main__"]
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            tarefas = [pool.submit(_aquecer) for _ in range(processos)]
+        finally:
+            sys.modules["__main__"] = principal
+    for tarefa in tarefas:
+        tarefa.result()
+    return pool
+
+
+def renderizar_painel(pool, cache, tipos, filtro, versao, data, selected, extras):
+    # Gera (tipo, png, erro): primeiro os do cache, depois os desenhados,
+    # à medida que terminam. Um gráfico com erro não derruba os outros.
+    # extras(tipo): argumentos além de (data, selected), só para os que faltam no cache.
+    # Um erro nos extras ou no envio (pool quebrado: BrokenProcessPool) também
+    # fica só no quadro daquele gráfico.
+    pendentes, arquivo = {}, None
+    try:
+        for tipo in tipos:
+            chave = chave_figura(tipo, filtro, versao)
+            png = cache.get(chave)
+            if png is not None:
+                yield tipo, png, None
+                continue
+            if isinstance(pool, ProcessPoolExecutor) and arquivo is None:
+                arquivo = os.path.join(PASTA_PAINEL, f"datafutebol-painel-{uuid.uuid4().hex}.arrow")
+                gravar_ipc(data, arquivo)
+            fatia = arquivo if arquivo is not None else data
+            try:
+                pendentes[pool.submit(_renderizar, tipo, fatia, selected, extras(tipo))] = (tipo, chave)
+            except Exception as erro:
+                yield tipo, None, erro
+        for tarefa in as_completed(pendentes):
+            tipo, chave = pendentes[tarefa]
+            try:
+                png = tarefa.result()
+            except Exception as erro:
+                yield tipo, None, erro
+                continue
+            cache.put(chave, png)
+            yield tipo, png, None
+    finally:
+        # Os processos que ainda mapeiam o arquivo seguem lendo até trocar de painel
+        if arquivo is not None:
+            os.remove(arquivo)
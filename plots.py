@@ -0,0 +1,462 @@
+import os
+import pickle
+import threading
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import LinearSegmentedColormap
+from mplsoccer import Pitch, VerticalPitch
+from highlight_text import ax_text
+
+from assets import fonte, logo
+from heatmap import grade_toques, desenhar_heatmap
+from posses import MIN_PASSES_REDE, rede_de_passes
+from zonas import CATEGORIAS_ZONA, NZX, NZY, TERCOS, contar_zonas
+
+plot_types = [
+    "Passes para o Terço Final",
+    "Ações Defensivas",
+    "Escanteios",
+    "Dribles Completos",
+    "Passes Progressivos",
+    "Passes Certos e Errados",
+    "Chances Criadas",
+    "Ações Defensivas no Ataque",
+    "Finalizações",
+    "Mapa de Calor",
+    "Passes para a Área",
+    "Mapa de Zonas",
+    "Rede de Passes",
+]
+
+# Fonte (resolvida uma vez por processo, assets.py)
+fnt = fonte()
+
+# ======================================================
+# MODELOS DE CAMPO (desenhados uma vez por processo)
+# ======================================================
+COR_FUNDO = "#f7f7f7"
+
+CAMPOS = {
+    "inteiro": lambda: Pitch(pitch_type="opta", line_color="dimgray", pitch_color=COR_FUNDO),
+    "meio vertical": lambda: VerticalPitch(pitch_type="opta", line_color="dimgray",
+                                           pitch_color=COR_FUNDO, half=True),
+    "zonas": lambda: Pitch(pitch_type="opta", line_color="dimgray", pitch_color=COR_FUNDO,
+                           linewidth=1, line_zorder=2),
+}
+
+# Variantes com vários campos na mesma figura (linhas x colunas)
+GRADES = {"zonas": {"nrows": 3, "ncols": 3}}
+
+_modelos = {}
+_lock_modelos = threading.Lock()
+
+
+def _desenhar_modelo(variante):
+    pitch = CAMPOS[variante]()
+    fig, ax = pitch.draw(figsize=(16, 11), **GRADES.get(variante, {}))
+    fig.set_facecolor(COR_FUNDO)
+    plt.close(fig)  # fora do pyplot: as cópias também ficam fora
+    return pitch, pickle.dumps(fig)
+
+
+def novo_campo(variante="inteiro"):
+    # Cópia do campo já desenhado (linhas, fundo, layout): cada gráfico só
+    # acrescenta os seus eventos. A figura não é registrada no pyplot, então
+    # é liberada assim que o PNG é gerado (figura_para_png).
+    # Nas variantes em grade, devolve a lista de eixos.
+    with _lock_modelos:
+        if variante not in _modelos:
+            _modelos[variante] = _desenhar_modelo(variante)
+        pitch, modelo = _modelos[variante]
+    fig = pickle.loads(modelo)
+    FigureCanvasAgg(fig)
+    return pitch, fig, fig.axes if variante in GRADES else fig.axes[0]
+
+
+# ======================================================
+# NÍVEL DE DETALHE DOS MAPAS DE PASSES
+# ======================================================
+# Acima de LIMITE_LOD passes numa camada (temporada inteira de um time, por
+# ex.) as linhas individuais viram zonas: cor pela quantidade de passes e
+# seta pela direção média. Os números do rodapé continuam exatos.
+LIMITE_LOD = int(os.environ.get("DATAFUTEBOL_LIMITE_LOD", 1000))
+ZONAS_LOD = (12, 8)
+
+# Segmentos por linha do efeito "cometa" (o padrão do mplsoccer é 100);
+# a 100 dpi 25 já é indistinguível e custa um quarto para desenhar
+SEGMENTOS_COMETA = 25
+
+# Entra na chave do cache de figuras (cache_figuras.py): aumentar a cada
+# mudança de desenho, modelo de campo ou estilo, para o disco não servir PNG
+# antigo. O limite de LOD entra junto porque muda o desenho sem mudar o código.
+VERSAO_PLOTS = 1
+VERSAO_FIGURAS = f"p{VERSAO_PLOTS}-lod{LIMITE_LOD}"
+
+
+def detalhado(passes):
+    return len(passes) <= LIMITE_LOD
+
+
+def mapa_fluxo(pitch, ax, passes, cor, densidade=True, setas=True, alpha=1):
+    # Passes agregados pela zona de origem
+    if densidade:
+        cmap = LinearSegmentedColormap.from_list("densidade", [COR_FUNDO, cor])
+        zonas = pitch.bin_statistic(passes.x, passes.y, statistic="count", bins=ZONAS_LOD)
+        pitch.heatmap(zonas, ax=ax, cmap=cmap, alpha=alpha, edgecolor=COR_FUNDO, zorder=0.5)
+    if setas:
+        pitch.flow(passes.x, passes.y, passes.endX, passes.endY, bins=ZONAS_LOD,
+                   arrow_type="scale", arrow_length=7, color=cor if not densidade else "black",
+                   alpha=alpha, ax=ax, zorder=2)
+
+
+def mapa_acerto(pitch, ax, passes, certos):
+    # Aproveitamento dos passes por zona de origem, de vermelho (0%) a azul (100%)
+    cmap = LinearSegmentedColormap.from_list("acerto", ["red", COR_FUNDO, "royalblue"])
+    zonas = pitch.bin_statistic(passes.x, passes.y, values=certos.astype("float64"),
+                                statistic="mean", bins=ZONAS_LOD)
+    pitch.heatmap(zonas, ax=ax, cmap=cmap, vmin=0, vmax=1, edgecolor=COR_FUNDO, zorder=0.5)
+    pitch.label_heatmap(zonas, ax=ax, str_format="{:.0%}", exclude_nan=True, fontproperties=fnt,
+                        fontsize=14, color="black", ha="center", va="center")
+
+
+def add_logo(fig, team_name):
+    # Logo já decodificado e reduzido; os que faltam são avisados na subida
+    img = logo(team_name)
+    if img is None:
+        return
+    ax_img = fig.add_axes([0.12, 0.93, 0.1, 0.1])
+    ax_img.imshow(img)
+    ax_img.axis("off")
+
+# ======================================================
+# FUNÇÕES DE PLOTAGEM
+# ======================================================
+
+def plot_passes_final(data, selected):
+    pitch, fig, ax = novo_campo()
+
+    passes = data[(data['type'] == 'Pass') & (data['outcomeType'] == 'Successful')]
+    terco_final = passes[passes['last_third_entry'] == True]
+    outros_passes = passes[passes['last_third_entry'] == False]
+
+    if detalhado(terco_final):
+        pitch.lines(terco_final.x, terco_final.y, terco_final.endX, terco_final.endY,
+                    comet=True, n_segments=SEGMENTOS_COMETA, color="seagreen", lw=4, ax=ax, linestyle="--")
+        ax.scatter(terco_final.endX, terco_final.endY, s=120, c="seagreen", edgecolors="black")
+    else:
+        mapa_fluxo(pitch, ax, terco_final, "seagreen", densidade=False)
+
+    if detalhado(outros_passes):
+        pitch.lines(outros_passes.x, outros_passes.y, outros_passes.endX, outros_passes.endY,
+                    comet=True, n_segments=SEGMENTOS_COMETA, color="gray", lw=4, ax=ax, alpha=0.3, linestyle="--")
+        ax.scatter(outros_passes.endX, outros_passes.endY, s=100, c="gray", edgecolors="black", alpha=0.3)
+    else:
+        mapa_fluxo(pitch, ax, outros_passes, "gray", setas=False, alpha=0.5)
+
+    v1, v2 = len(outros_passes), len(terco_final)
+    ax.set_title(f"Passes para o Terço Final - {selected}", fontproperties=fnt, fontsize=30)
+    ax_text(50, 102, s=f'<Total: {v1}> | <Terço Final: {v2}> | viz by @DataFutebol',
+            highlight_textprops=[{"color": "black"}, {"color": "seagreen"}],
+            ax=ax, fig=fig, fontproperties=fnt, ha='center', va='center', fontsize=15, color="dimgray")
+
+    add_logo(fig, data['teamName'].iloc[0])
+    return fig
+
+def plot_boxpass(data, selected):
+    pitch, fig, ax = novo_campo()
+
+    passes_box = data[(data['type'] == 'Pass') & (data['outcomeType'] == 'Successful') & (data['passFreekick'])]
+    box = passes_box[passes_box['box_entry'] == True]
+
+    pitch.lines(box.x, box.y, box.endX, box.endY,
+                comet=True, n_segments=SEGMENTOS_COMETA, color="green", lw=4, ax=ax)
+    ax.scatter(box.endX, box.endY, s=120, c="green",  edgecolors="black")
+
+    box_count = len(box)
+    ax.set_title(f"Passes para a Área - {selected}", fontproperties=fnt, fontsize=30)
+    ax_text(50, 102, s=f'<Total: {box_count}> | viz by @DataFutebol',
+            highlight_textprops=[{"color": "green"}],
+            ax=ax, fig=fig, fontproperties=fnt, ha='center', va='center', fontsize=15, color="dimgray")
+
+    add_logo(fig, data['teamName'].iloc[0])
+    return fig
+
+def plot_defensivas(data, selected):
+    pitch, fig, ax = novo_campo()
+
+    tackle = data[data['type'] == 'Tackle']
+    interception = data[data['type'] == 'Interception']
+    clearance = data[data['type'] == 'Clearance']
+    ball_recovery = data[data['type'] == 'BallRecovery']
+    foul = data[data['type'] == 'Foul']
+
+    pitch.scatter(tackle.x, tackle.y, s=200, c="royalblue", edgecolors="black", ax=ax)
+    pitch.scatter(interception.x, interception.y, s=200, c="orange", edgecolors="black", marker='s', ax=ax)
+    pitch.scatter(clearance.x, clearance.y, s=200, c="purple", edgecolors="black", marker='H', ax=ax)
+    pitch.scatter(ball_recovery.x, ball_recovery.y, s=200, c="green", edgecolors="black", marker='D', ax=ax)
+    pitch.scatter(foul.x, foul.y, s=200, c="red", edgecolors="black", marker='X', ax=ax)
+
+    tk, it, cl, br, fo = len(tackle), len(interception), len(clearance), len(ball_recovery), len(foul)
+
+    ax.set_title(f"Ações Defensivas - {selected}", fontproperties=fnt, fontsize=30)
+    ax_text(50, 102, s=f'<Desarmes: {tk}> | <Interceptações: {it}> | <Bolas Recuperadas: {br}> | '
+                       f'<Rebatidas: {cl}> | <Faltas: {fo}> | viz by @DataFutebol',
+            highlight_textprops=[{"color": "royalblue"}, {"color": "orange"},
+                                 {"color": "green"}, {"color": "purple"}, {"color": "red"}],
+            ax=ax, fig=fig, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
+
+    add_logo(fig, data['teamName'].iloc[0])
+    return fig
+
+
+def plot_escanteios(data, selected):
+    pitch, fig, ax = novo_campo()
+
+    complete_pass = data[data['passCornerAccurate'] == True]
+    incomplete_pass = data[data['passCornerInaccurate'] == True]
+
+    pitch.lines(incomplete_pass.x, incomplete_pass.y, incomplete_pass.endX, incomplete_pass.endY,
+                lw=5, comet=True, n_segments=SEGMENTOS_COMETA, color='purple', ax=ax, alpha=0.2)
+    pitch.scatter(incomplete_pass.endX, incomplete_pass.endY, color='none',
+                  s=300, edgecolors='purple', ax=ax, marker='X')
+
+    pitch.lines(complete_pass.x, complete_pass.y, complete_pass.endX, complete_pass.endY,
+                lw=5, comet=True, n_segments=SEGMENTOS_COMETA, color='green', ax=ax, alpha=0.2)
+    pitch.scatter(complete_pass.endX, complete_pass.endY, color='green',
+                  s=300, edgecolors='black', ax=ax)
+
+    v1 = len(complete_pass)
+    v2 = 100 * (len(complete_pass) / (len(complete_pass) + len(incomplete_pass))) if len(complete_pass)+len(incomplete_pass) > 0 else 0
+
+    ax.set_title(f"Escanteios - {selected}", fontproperties=fnt, fontsize=30)
+    ax_text(50, 102, s=f'<Escanteios Certos: {v1}> | <Aproveitamento: {v2:.2f}%> | viz by @DataFutebol',
+            highlight_textprops=[{"color": "green"}, {"color": "black"}],
+            ax=ax, fig=fig, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
+
+    add_logo(fig, data['teamName'].iloc[0])
+    return fig
+
+def plot_dribles(data, selected):
+    pitch, fig, ax = novo_campo()
+
+    drib = data[data["dribbleWon"] == True]
+    dribe = data[data["dribbleLost"] == True]
+    pitch.scatter(drib.x, drib.y, s=200, c="darkgreen", marker="^", ax=ax, edgecolors="black")
+    pitch.scatter(dribe.x, dribe.y, s=200, c="red", marker="^", ax=ax, edgecolors="black")
+
+    v1 = len(drib)
+    v2 = 100*(len(drib)/(len(drib) + len(dribe))) if len(drib)+len(dribe) > 0 else 0
+    ax.set_title(f"Dribles Completos - {selected}", fontproperties=fnt, fontsize=30)
+    ax_text(50, 102, s=f'<Dribles Completos: {v1}> | <Aproveitamento: {v2:.2f}%> | viz by @DataFutebol',
+        highlight_textprops=[{"color": "green"}, {"color":"black"}],
+        ax=ax, fig=fig, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
+
+    add_logo(fig, data['teamName'].iloc[0])
+    return fig
+
+def plot_passes_progressivos(data, selected):
+    pitch, fig, ax = novo_campo()
+
+    passes = data[(data["type"] == "Pass") & (data["progressive_action"] == True) & (data['passFreekick'] == False)]
+    p = data[(data["type"] == "Pass") & (data["progressive_action"] == False)]
+    if detalhado(passes):
+        pitch.lines(passes.x, passes.y, passes.endX, passes.endY,
+                    comet=True, n_segments=SEGMENTOS_COMETA, color="blue", lw=3, ax=ax)
+        pitch.scatter(passes.endX, passes.endY, s=200, c="blue", marker="o", ax=ax, edgecolors="black")
+    else:
+        mapa_fluxo(pitch, ax, passes, "blue", densidade=False)
+    if detalhado(p):
+        pitch.lines(p.x, p.y, p.endX, p.endY,
+                    comet=True, n_segments=SEGMENTOS_COMETA, color="gray", lw=3, alpha = 0.3, ax=ax)
+        pitch.scatter(p.endX, p.endY, s=100, c="gray", marker="o", alpha = 0.3, ax=ax, edgecolors="black")
+    else:
+        mapa_fluxo(pitch, ax, p, "gray", setas=False, alpha=0.5)
+
+    ax.set_title(f"Passes Progressivos - {selected}", fontproperties=fnt, fontsize=30)
+    ax_text(50, 102, s=f'<Total: {len(passes)}> | viz by @DataFutebol',
+            highlight_textprops=[{"color": "black"}], ax=ax, fig=fig, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
+
+    add_logo(fig, data['teamName'].iloc[0])
+    return fig
+
+def plot_passes_certos_errados(data, selected):
+    pitch, fig, ax = novo_campo()
+
+    passes = data[(data["type"] == "Pass") & (data['passFreekick'] == False)]
+    certos = passes[passes["outcomeType"] == "Successful"]
+    errados = passes[passes["outcomeType"] == "Unsuccessful"]
+
+    if detalhado(passes):
+        pitch.lines(certos.x, certos.y, certos.endX, certos.endY,
+                    comet=True, n_segments=SEGMENTOS_COMETA, color="royalblue", lw=3, ax=ax)
+        pitch.scatter(certos.endX, certos.endY,
+                      color='royalblue', s=300, edgecolors='black', ax=ax)
+        pitch.lines(errados.x, errados.y, errados.endX, errados.endY,
+                    comet=True, n_segments=SEGMENTOS_COMETA, color="red", lw=2, ax=ax, alpha=0.7)
+        pitch.scatter(errados.endX, errados.endY,
+                      color='red', s=300, edgecolors='black', ax=ax, alpha = 0.7)
+    else:
+        mapa_acerto(pitch, ax, passes, passes["outcomeType"] == "Successful")
+
+    ax.set_title(f"Passes Certos e Errados - {selected}", fontproperties=fnt, fontsize=30)
+    ax_text(50, 102, s=f'<Certos: {len(certos)}> | <Errados: {len(errados)}> | viz by @DataFutebol', highlight_textprops=[{"color": "royalblue"}, {"color": "red"}],
+        ax=ax, fig=fig, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
+
+    add_logo(fig, data['teamName'].iloc[0])
+    return fig
+
+def plot_chances(data, selected):
+    pitch, fig, ax = novo_campo()
+
+    chances = data[(data["passKey"] == True) & (data['assist'] == False)]
+    pitch.lines(chances.x, chances.y, chances.endX, chances.endY,
+                comet=True, n_segments=SEGMENTOS_COMETA, color="blue", lw=3, ax=ax)
+    pitch.scatter(chances.endX, chances.endY, s=100, c="blue", marker ='s', edgecolors="black", ax=ax)
+    assists = data[data['assist'] == True]
+    pitch.lines(assists.x, assists.y, assists.endX, assists.endY,
+                comet=True, n_segments=SEGMENTOS_COMETA, color="gold", lw=3, ax=ax)
+    pitch.scatter(assists.endX, assists.endY, s=400, c="gold", marker ='*', edgecolors="black", ax=ax)
+
+
+    ax.set_title(f"Chances Criadas - {selected}", fontproperties=fnt, fontsize=30)
+    ax_text(50, 102, s=f'<Chances Criadas: {len(chances)}> | <Assistências> | viz by @DataFutebol', highlight_textprops=[{"color": "blue"}, {"color": "gold"}],
+        ax=ax, fig=fig, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
+
+    add_logo(fig, data['teamName'].iloc[0])
+    return fig
+
+def plot_defensivas_ataque(data, selected):
+    pitch, fig, ax = novo_campo("meio vertical")
+    at = data[data['x'] > 50]
+    tacklea = at[at['type'] == 'Tackle']
+    interceptiona = at[at['type'] == 'Interception']
+    ball_recoverya = at[at['type'] == 'BallRecovery']
+    foula = at[at['type'] == 'Foul']
+    pitch.scatter(tacklea.x, tacklea.y, s=200, c="royalblue", edgecolors="black", ax=ax)
+    pitch.scatter(interceptiona.x, interceptiona.y, s=200, c="orange", edgecolors="black", marker = 's', ax=ax)
+    pitch.scatter(ball_recoverya.x, ball_recoverya.y, s=200, c="green", edgecolors="black", marker = 'D', ax=ax)
+    pitch.scatter(foula.x, foula.y, s=200, c="red", edgecolors="black", marker = 'X', ax=ax)
+    tka = len(tacklea)
+    ita = len(interceptiona)
+    bra = len(ball_recoverya)
+    foa = len(foula)
+
+    ax.set_title(f"Ações Defensivas no Campo de Ataque - {selected}", fontproperties=fnt, fontsize=30)
+    ax_text(50, 102, s=f'<Desarmes: {tka}> | <Interceptações: {ita}> | <Bolas Recuperadas: {bra}> | <Faltas: {foa}> | viz by @DataFutebol',
+        highlight_textprops=[{"color": "royalblue"}, {"color": "orange"}, {"color":"green"}, {"color":"red"}],
+        ax=ax, fig=fig, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
+
+    add_logo(fig, data['teamName'].iloc[0])
+    return fig
+
+def plot_finalizacoes(data, selected):
+    pitch, fig, ax = novo_campo("meio vertical")
+
+    goals = data[data['isGoal'] == True]
+    off_target = data[data['shotOffTarget'] == True]
+    trave = data[data['shotOnPost'] == True]
+    on_target = data[(data['shotOnTarget'] == True) & (data['isGoal'] == False)]
+    pitch.scatter(off_target.x, off_target.y,
+                  c="red", s=300, marker="X", ax=ax)
+    pitch.scatter(trave.x, trave.y,
+                  c="blue", s=250, marker="^", ax=ax)
+    pitch.scatter(on_target.x, on_target.y,
+                  c="green", s=350, marker="o", ax=ax)
+    pitch.scatter(goals.x, goals.y,
+                  c="gold", s=500, marker="*", edgecolors="black", ax=ax)
+
+    go = len(goals)
+    of = len(off_target)
+    tr = len(trave)
+    on = len(on_target)
+    ax.set_title(f"Finalizações - {selected}", fontproperties=fnt, fontsize=30)
+    ax_text(50, 102, s=f'<Gols: {go}> | <Pra Fora: {of}> | <Trave: {tr}> | <No Alvo: {on}> | viz by @DataFutebol',
+        highlight_textprops=[{"color": "gold"}, {"color": "red"}, {"color":"blue"}, {"color":"green"}],
+        ax=ax, fig=fig, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
+
+    add_logo(fig, data['teamName'].iloc[0])
+    return fig
+
+def plot_heatmap(data, selected, grade=None, modo="grade"):
+    pitch, fig, ax = novo_campo()
+    act = data[data['isTouch'] == True]
+    if modo == "kde":
+        pitch.kdeplot(act.x, act.y, ax=ax, shade=True, cmap="Reds", bw_adjust=1,
+                      levels=100, fill=True, alpha = 0.7)
+    else:
+        # Grade binada + gaussiana: mesmo visual do KDE em milissegundos
+        if grade is None:
+            grade = grade_toques(act.x, act.y)
+        desenhar_heatmap(ax, grade)
+
+    ax.set_title(f"Heatmap - {selected}", fontproperties=fnt, fontsize=30)
+    add_logo(fig, data['teamName'].iloc[0])
+    return fig
+
+def plot_zonas(data, selected, contagens=None):
+    # Um campo por categoria, com as contagens por zona; contagens vem do
+    # cubo de zonas (zonas.py) ou, sem ele, é contado da própria fatia
+    pitch, fig, axs = novo_campo("zonas")
+    if contagens is None:
+        contagens = contar_zonas(data)
+    cmap = LinearSegmentedColormap.from_list("zonas", [COR_FUNDO, "royalblue"])
+    for ax, categoria, matriz in zip(axs, CATEGORIAS_ZONA, contagens):
+        zonas = pitch.bin_statistic(np.empty(0), np.empty(0), statistic="count", bins=(NZX, NZY))
+        zonas["statistic"] = matriz.T[::-1].astype("float64")  # linhas do mplsoccer: y de cima para baixo
+        pitch.heatmap(zonas, ax=ax, cmap=cmap, edgecolor=COR_FUNDO, zorder=0.5)
+        pitch.label_heatmap(zonas, ax=ax, str_format="{:.0f}", exclude_zeros=True, fontproperties=fnt,
+                            fontsize=11, color="black", ha="center", va="center")
+        total = matriz.sum()
+        ataque = matriz[TERCOS["Ataque"]].sum() / total if total else 0
+        ax.set_title(f"{categoria}: {total} ({ataque:.0%} no terço final)", fontproperties=fnt, fontsize=16)
+
+    fig.suptitle(f"Mapa de Zonas - {selected}", fontproperties=fnt, fontsize=30)
+    add_logo(fig, data['teamName'].iloc[0])
+    return fig
+
+def plot_rede(data, selected, rede=None):
+    # Rede do time (nós, arestas) vem pronta do app/lote; sem ela, só uma
+    # fatia de time serve (a de um jogador não tem os passes dos outros)
+    if rede is None:
+        if data["playerName"].nunique() <= 1:
+            raise ValueError("Rede de Passes de um jogador precisa da rede do time (rede_de_passes)")
+        rede = rede_de_passes(data)
+    pitch, fig, ax = novo_campo()
+    nos, arestas = rede
+    posicao = nos.set_index("playerName")
+    if len(arestas):
+        de, para = posicao.loc[arestas["playerName"]], posicao.loc[arestas["receptor"]]
+        largura = 1 + 9 * arestas["passes"].to_numpy() / arestas["passes"].max()
+        pitch.lines(de.x, de.y, para.x, para.y, lw=largura, color="royalblue", alpha=0.5, ax=ax, zorder=1)
+    cores = np.where(nos["playerName"] == selected, "orange", "royalblue")
+    tamanhos = 300 + 1500 * nos["acoes"] / max(nos["acoes"].max(), 1)
+    pitch.scatter(nos.x, nos.y, s=tamanhos, c=cores, edgecolors="black", ax=ax, zorder=2)
+    for _, no in nos.iterrows():
+        pitch.annotate(no.playerName.split()[-1], (no.x, no.y - 4), ax=ax, fontproperties=fnt,
+                       fontsize=13, ha="center", va="center", zorder=3)
+
+    ax.set_title(f"Rede de Passes - {selected}", fontproperties=fnt, fontsize=30)
+    ax_text(50, 102, s=f'<Passes entre jogadores: {arestas["passes"].sum()}> (mín. de {MIN_PASSES_REDE} por dupla) | viz by @DataFutebol',
+        highlight_textprops=[{"color": "royalblue"}],
+        ax=ax, fig=fig, fontproperties=fnt, ha='center', va='center', color='dimgray', fontsize=15)
+
+    add_logo(fig, data['teamName'].iloc[0])
+    return fig
+
+plot_functions = {
+    "Passes para o Terço Final": plot_passes_final,
+    "Ações Defensivas": plot_defensivas,
+    "Escanteios": plot_escanteios,
+    "Dribles Completos": plot_dribles,
+    "Passes Progressivos": plot_passes_progressivos,
+    "Passes Certos e Errados": plot_passes_certos_errados,
+    "Chances Criadas": plot_chances,
+    "Ações Defensivas no Ataque": plot_defensivas_ataque,
+    "Finalizações": plot_finalizacoes,
+    "Mapa de Calor": plot_heatmap,
+    "Passes para a Área": plot_boxpass,
+    "Mapa de Zonas": plot_zonas,
+    "Rede de Passes": plot_rede,
+}
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+# ===========================
+# POSSES E RECEPTORES DOS PASSES
+# ===========================
+# Ordem cronológica dentro da partida; eventId desempata quando existe
+# (sem ele, vale a ordem do arquivo)
+COLUNAS_ORDEM = ["minute", "second", "eventId"]
+
+# Passes entre o mesmo par abaixo disso não entram na rede
+MIN_PASSES_REDE = 2
+
+
+def anexar_posses(df):
+    # Acrescenta "posse" (id na temporada) e "receptor" (quem recebeu cada
+    # passe certo), tudo vetorizado. A posse muda quando o time do toque na
+    # bola muda; eventos sem toque (faltas, disputas) ficam na posse
+    # corrente. O receptor é o autor do próximo toque do mesmo time, se
+    # ainda na mesma posse e se não for o próprio passador.
+    ordem = ["matchId"] + [c for c in COLUNAS_ORDEM if c in df]
+    cron = df[ordem + ["teamId", "playerName", "type", "outcomeType", "isTouch"]].sort_values(ordem, kind="stable")
+
+    toque = cron["isTouch"].to_numpy(dtype=bool)
+    toques = cron[toque]
+    partida, time = toques["matchId"].to_numpy(), toques["teamId"].to_numpy()
+    nova = np.ones(len(toques), dtype=bool)
+    nova[1:] = (partida[1:] != partida[:-1]) | (time[1:] != time[:-1])
+    posse = np.zeros(len(cron), dtype="int64")
+    posse[toque] = np.cumsum(nova)
+    posse = np.maximum.accumulate(posse)  # sem toque: herda a posse anterior
+    toques = toques.assign(posse=posse[toque])
+
+    grupos = toques.groupby(["matchId", "teamId"], sort=False, observed=True)
+    proximo = grupos["playerName"].shift(-1)
+    mesma_posse = grupos["posse"].shift(-1) == toques["posse"]
+    passe_certo = (toques["type"] == "Pass") & (toques["outcomeType"] == "Successful")
+    receptor = proximo.where(passe_certo & mesma_posse & (proximo != toques["playerName"]))
+
+    df["posse"] = pd.Series(posse.astype("int32"), index=cron.index).reindex(df.index)
+    df["receptor"] = receptor.reindex(df.index).astype("category")
+    return df
+
+
+def rede_de_passes(df, minimo=MIN_PASSES_REDE):
+    # Rede de um time: nós na posição média de cada jogador (onde passa e
+    # onde recebe), arestas passador -> receptor com o número de passes
+    passes = df[df["receptor"].notna()]
+    dados = passes[["playerName", "x", "y"]]
+    recebidos = passes[["receptor", "endX", "endY"]].set_axis(["playerName", "x", "y"], axis=1)
+    posicoes = pd.concat([dados.astype({"playerName": "object"}), recebidos.astype({"playerName": "object"})])
+    nos = posicoes.groupby("playerName").agg(x=("x", "mean"), y=("y", "mean"), acoes=("x", "size")).reset_index()
+
+    arestas = (passes.astype({"playerName": "object", "receptor": "object"})
+               .groupby(["playerName", "receptor"]).size().rename("passes").reset_index())
+    return nos, arestas[arestas["passes"] >= minimo].reset_index(drop=True)
@@ -0,0 +1,174 @@
+import matplotlib
+matplotlib.use("Agg")  # sem janela: roda em servidor/CI
+
+import argparse
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from assets import verificar_assets
+from cache_figuras import figura_para_png
+from dados import PASTA_ESPELHO, fatiar, ler_eventos, ler_indice, ler_times, listar_fontes
+from plots import VERSAO_FIGURAS, plot_functions, plot_types
+from posses import rede_de_passes
+
+# ===========================
+# RENDERIZAÇÃO EM LOTE
+# ===========================
+# python render_lote.py --competicao BRA --temporada 2025 --saida saida -p 4
+# Gera todos os gráficos (plots.plot_types) de cada time e de cada jogador
+# regular da temporada:
+#   saida/BRA-2025/flamengo/<grafico>.png
+#   saida/BRA-2025/flamengo/jogadores/<jogador>/<grafico>.png
+# Alvos cujos eventos (e os do time, que entram na Rede de Passes do
+# jogador) e versão dos gráficos não mudaram desde a última execução são pulados.
+
+ARQUIVO_IMPRESSOES = "_impressoes.json"
+
+# Estado de cada processo do pool (eventos indexados, carregados uma vez)
+_estado = {}
+
+
+def slug(texto):
+    texto = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode()
+    return "-".join("".join(c if c.isalnum() else " " for c in texto.lower()).split())
+
+
+def _iniciar(fonte):
+    # Com DATAFUTEBOL_ESPELHO todos os processos mapeiam o mesmo arquivo
+    team_mapping = ler_times()
+    _estado["eventos"], _estado["limites"] = ler_indice(fonte, team_mapping)
+    _estado["team_mapping"] = team_mapping
+    _estado["redes"] = {}
+    _estado["impressoes_time"] = {}
+
+
+def _args_extras(team_id):
+    # Como no app: a Rede de Passes de time e jogadores é a do time inteiro
+    # (uma por time e processo)
+    if team_id not in _estado["redes"]:
+        _estado["redes"][team_id] = rede_de_passes(fatiar(_estado["eventos"], _estado["limites"], team_id))
+    return {"Rede de Passes": (_estado["redes"][team_id],)}
+
+
+def impressao(*fatias):
+    # Impressão digital do conteúdo dos eventos e da versão dos gráficos
+    h = hashlib.sha1(VERSAO_FIGURAS.encode())
+    for fatia in fatias:
+        h.update(pd.util.hash_pandas_object(fatia, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def _impressao_time(team_id):
+    # Uma por time e processo: entra na impressão de cada jogador do time
+    if team_id not in _estado["impressoes_time"]:
+        _estado["impressoes_time"][team_id] = impressao(fatiar(_estado["eventos"], _estado["limites"], team_id))
+    return _estado["impressoes_time"][team_id]
+
+
+def _renderizar_alvo(team_id, player_name, pasta, anterior):
+    fatia = fatiar(_estado["eventos"], _estado["limites"], team_id, player_name)
+    if player_name is None:
+        atual = _impressao_time(team_id)
+    else:
+        atual = hashlib.sha1((impressao(fatia) + _impressao_time(team_id)).encode()).hexdigest()
+    arquivos = {tipo: os.path.join(pasta, f"{slug(tipo)}.png") for tipo in plot_types}
+    if atual == anterior and all(os.path.exists(arq) for arq in arquivos.values()):
+        return pasta, atual, 0, []
+
+    os.makedirs(pasta, exist_ok=True)
+    selected = player_name if player_name is not None else _estado["team_mapping"][team_id]
+    feitos, falhas = 0, []
+    extras = _args_extras(team_id)
+    for tipo, arquivo in arquivos.items():
+        try:
+            png = figura_para_png(plot_functions[tipo](fatia, selected, *extras.get(tipo, ())))
+        except Exception as erro:
+            falhas.append(f"{arquivo}: {erro!r}")
+            continue
+        with open(arquivo, "wb") as f:
+            f.write(png)
+        feitos += 1
+    # com falha a impressão não é gravada, para tentar de novo na próxima
+    return pasta, (atual if not falhas else None), feitos, falhas
+
+
+def listar_alvos(fonte, team_mapping, saida, min_jogos):
+    # Times do mapeamento + jogadores com pelo menos min_jogos partidas
+    jogos = ler_eventos(fonte, ["teamId", "playerName", "matchId"]).groupby(
+        ["teamId", "playerName"], observed=True)["matchId"].nunique()
+    alvos = []
+    for team_id in sorted(jogos.index.get_level_values("teamId").unique()):
+        if team_id not in team_mapping:
+            continue
+        pasta_time = os.path.join(saida, slug(team_mapping[team_id]))
+        alvos.append((int(team_id), None, pasta_time))
+        regulares = jogos.loc[team_id]
+        for player_name in sorted(regulares[regulares >= min_jogos].index):
+            alvos.append((int(team_id), player_name, os.path.join(pasta_time, "jogadores", slug(player_name))))
+    return alvos
+
+
+def renderizar_lote(fonte, saida, processos=None, min_jogos=3):
+    os.makedirs(saida, exist_ok=True)
+    arquivo_impressoes = os.path.join(saida, ARQUIVO_IMPRESSOES)
+    impressoes = {}
+    if os.path.exists(arquivo_impressoes):
+        with open(arquivo_impressoes, encoding="utf-8") as f:
+            impressoes = json.load(f)
+
+    team_mapping = ler_times()
+    for faltando in verificar_assets(team_mapping.values()):
+        print(f"  asset não encontrado: {faltando}")
+    alvos = listar_alvos(fonte, team_mapping, saida, min_jogos)
+    if PASTA_ESPELHO:
+        ler_indice(fonte, team_mapping)  # grava o espelho antes de abrir o pool
+    inicio = time.perf_counter()
+    total, pulados, falhas = 0, 0, []
+
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar, initargs=(fonte,)) as pool:
+        tarefas = [pool.submit(_renderizar_alvo, team_id, player_name, pasta,
+                               impressoes.get(os.path.relpath(pasta, saida)))
+                   for team_id, player_name, pasta in alvos]
+        for tarefa in as_completed(tarefas):
+            pasta, atual, feitos, erros = tarefa.result()
+            chave = os.path.relpath(pasta, saida)
+            if atual is not None:
+                impressoes[chave] = atual
+            else:
+                impressoes.pop(chave, None)
+            if feitos == 0 and not erros:
+                pulados += 1
+            total += feitos
+            falhas += erros
+
+    with open(arquivo_impressoes, "w", encoding="utf-8") as f:
+        json.dump(impressoes, f, indent=1, ensure_ascii=False)
+
+    duracao = time.perf_counter() - inicio
+    print(f"{len(alvos)} alvos ({pulados} sem mudança), {total} figuras em {duracao:.1f}s "
+          f"({total / duracao if duracao else 0:.1f} figuras/s)")
+    for falha in falhas:
+        print(f"  falhou {falha}")
+    return total, pulados, falhas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Renderiza todos os gráficos de times e jogadores")
+    parser.add_argument("--competicao", default="BRA")
+    parser.add_argument("--temporada", default="2025")
+    parser.add_argument("--saida", default="saida")
+    parser.add_argument("-p", "--processos", type=int, default=None, help="padrão: nº de CPUs")
+    parser.add_argument("--min-jogos", type=int, default=3, help="jogos para o jogador entrar no lote")
+    args = parser.parse_args()
+
+    fontes = listar_fontes()
+    if (args.competicao, args.temporada) not in fontes:
+        parser.error(f"temporada {args.competicao}/{args.temporada} não encontrada")
+    saida = os.path.join(args.saida, f"{args.competicao}-{args.temporada}")
+    renderizar_lote(fontes[(args.competicao, args.temporada)], saida, args.processos, args.min_jogos)
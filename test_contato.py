@@ -0,0 +1,13 @@
+from benchmark import checar_orcamento, medir_partida_fria
+
+# ===========================
+# PARTIDA A FRIO DO CONTATO
+# ===========================
+# python -m pytest: o Contato, num processo novo, tem de ficar dentro do
+# orçamento de tempo e sem importar a pilha científica (benchmark.py)
+
+
+def test_contato_partida_fria():
+    etapas = {}
+    medir_partida_fria(etapas)
+    assert checar_orcamento({"etapas": etapas}) == []
@@ -0,0 +1,80 @@
+import numpy as np
+
+from zonas import indice_zona
+
+# ===========================
+# AMEAÇA ESPERADA (xT)
+# ===========================
+# Modelo de Markov de Karun Singh numa grade 16 x 12, ajustado nos eventos
+# da própria temporada: em cada zona o time chuta (e marca com a taxa de
+# gols dela) ou passa para outra zona. O valor de um passe certo é o xT do
+# destino menos o da origem. Os eventos não têm conduções, então só passes.
+XT_NX, XT_NY = 16, 12
+
+# Colunas usadas no ajuste e no valor por evento
+COLUNAS_XT = ["x", "y", "endX", "endY", "passAccurate", "passInaccurate", "shotsTotal", "isGoal"]
+
+# Iterações do xT = chute * gol + movimento * T @ xT (converge bem antes)
+ITERACOES_XT = 50
+
+
+def _flag(df, col):
+    return df[col].to_numpy(dtype=bool)
+
+
+def _passes_certos(df):
+    # Passes certos com origem e destino conhecidos
+    certo = _flag(df, "passAccurate")
+    for col in ["x", "y", "endX", "endY"]:
+        certo = certo & df[col].notna().to_numpy()
+    return certo
+
+
+def ajustar_xt(df):
+    # Grade XT_NX x XT_NY de xT; só bincounts e produtos matriz x vetor
+    n = XT_NX * XT_NY
+    com_posicao = df["x"].notna().to_numpy() & df["y"].notna().to_numpy()
+    origem = indice_zona(df["x"].fillna(0), df["y"].fillna(0), XT_NX, XT_NY)
+    chute = _flag(df, "shotsTotal") & com_posicao
+    passe = (_flag(df, "passAccurate") | _flag(df, "passInaccurate")) & com_posicao
+    certo = _passes_certos(df)
+
+    chutes = np.bincount(origem[chute], minlength=n)
+    gols = np.bincount(origem[chute & _flag(df, "isGoal")], minlength=n)
+    acoes = chutes + np.bincount(origem[passe], minlength=n)
+    p_gol = np.divide(gols, chutes, out=np.zeros(n), where=chutes > 0)
+    p_chute = np.divide(chutes, acoes, out=np.zeros(n), where=acoes > 0)
+
+    # Transições já multiplicadas pela chance de passar: passes certos de
+    # z para z' / todas as ações em z (passe errado perde a bola: vale 0)
+    destino = indice_zona(df["endX"].to_numpy()[certo], df["endY"].to_numpy()[certo], XT_NX, XT_NY)
+    transicoes = np.bincount(origem[certo] * n + destino, minlength=n * n).reshape(n, n).astype("float64")
+    transicoes /= np.maximum(acoes, 1)[:, None]
+
+    valor_chute = p_chute * p_gol
+    xt = np.zeros(n)
+    for _ in range(ITERACOES_XT):
+        novo = valor_chute + transicoes @ xt
+        if np.abs(novo - xt).max() < 1e-9:
+            xt = novo
+            break
+        xt = novo
+    return xt.reshape(XT_NX, XT_NY)
+
+
+def valor_xt(df, grade):
+    # xT ganho por evento (float32): destino - origem nos passes certos, 0 no resto
+    certo = _passes_certos(df)
+    plano = grade.ravel()
+    valor = np.zeros(len(df), dtype="float32")
+    origem = indice_zona(df["x"].to_numpy()[certo], df["y"].to_numpy()[certo], XT_NX, XT_NY)
+    destino = indice_zona(df["endX"].to_numpy()[certo], df["endY"].to_numpy()[certo], XT_NX, XT_NY)
+    valor[certo] = plano[destino] - plano[origem]
+    return valor
+
+
+def anexar_xt(df):
+    # Ajusta a grade nos próprios eventos e grava a coluna "xT" neles
+    grade = ajustar_xt(df)
+    df["xT"] = valor_xt(df, grade)
+    return grade
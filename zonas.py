@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+from dados import TIPOS_FINALIZACAO
+from heatmap import GRADE_CHAVES
+
+# ===========================
+# ZONAS DO CAMPO (Opta 100x100)
+# ===========================
+# 6 faixas no comprimento (2 por terço) x 5 corredores na largura
+NZX, NZY = 6, 5
+N_ZONAS = NZX * NZY
+
+TERCOS = {"Defensivo": slice(0, 2), "Meio": slice(2, 4), "Ataque": slice(4, 6)}
+
+# Mesmas definições dos mapas (plots.py): por tipo e resultado do evento
+CATEGORIAS_ZONA = [
+    "Passes Certos", "Passes Errados", "Passes Progressivos", "Desarmes", "Interceptações",
+    "Bolas Recuperadas", "Faltas", "Finalizações", "Toques",
+]
+
+# Colunas necessárias (todas já estão nos eventos das Visualizações)
+COLUNAS_ZONAS = GRADE_CHAVES + ["type", "outcomeType", "x", "y", "progressive_action", "isTouch"]
+
+
+def indice_zona(x, y, nx=NZX, ny=NZY):
+    # Zona (ix * ny + iy) de cada coordenada numa grade nx x ny do campo
+    ix = np.clip((np.asarray(x, dtype="float64") / 100 * nx).astype("int64"), 0, nx - 1)
+    iy = np.clip((np.asarray(y, dtype="float64") / 100 * ny).astype("int64"), 0, ny - 1)
+    return ix * ny + iy
+
+
+def mascaras_categorias(df):
+    # (categoria, evento) -> bool, na ordem de CATEGORIAS_ZONA
+    tipo = df["type"]
+    passe = (tipo == "Pass").to_numpy()
+    certo = (df["outcomeType"] == "Successful").to_numpy()
+    return np.stack([
+        passe & certo,
+        passe & ~certo,
+        passe & df["progressive_action"].to_numpy(dtype=bool),
+        (tipo == "Tackle").to_numpy(),
+        (tipo == "Interception").to_numpy(),
+        (tipo == "BallRecovery").to_numpy(),
+        (tipo == "Foul").to_numpy(),
+        tipo.isin(TIPOS_FINALIZACAO).to_numpy(),
+        df["isTouch"].to_numpy(dtype=bool),
+    ])
+
+
+def _com_posicao(df):
+    return df[df["x"].notna() & df["y"].notna()]
+
+
+# ===========================
+# CUBO JOGADOR x PARTIDA x CATEGORIA x ZONA
+# ===========================
+def construir_zonas(df):
+    # ndarray (jogador x time x partida, categoria, zona) com as contagens,
+    # montado uma vez na carga. Mapa de zonas, resumo por terço e time x
+    # time de qualquer filtro viram somas de linhas deste cubo.
+    df = _com_posicao(df)
+    codigos, chaves = df.set_index(GRADE_CHAVES).index.factorize()
+    celulas = codigos * N_ZONAS + indice_zona(df["x"], df["y"])
+    cubo = np.empty((len(chaves), len(CATEGORIAS_ZONA), N_ZONAS), dtype="int32")
+    for c, mascara in enumerate(mascaras_categorias(df)):
+        cubo[:, c, :] = np.bincount(celulas[mascara], minlength=len(chaves) * N_ZONAS).reshape(-1, N_ZONAS)
+    return chaves.set_names(GRADE_CHAVES).to_frame(index=False), cubo
+
+
+def somar_zonas(cubo, mascara):
+    # (categoria, NZX, NZY) das linhas do filtro
+    return cubo[np.flatnonzero(mascara)].sum(axis=0).reshape(len(CATEGORIAS_ZONA), NZX, NZY)
+
+
+def contar_zonas(df):
+    # O mesmo que somar_zonas, direto dos eventos (sem o cubo)
+    df = _com_posicao(df)
+    zonas = indice_zona(df["x"], df["y"])
+    return np.stack([np.bincount(zonas[mascara], minlength=N_ZONAS) for mascara in mascaras_categorias(df)]
+                    ).reshape(len(CATEGORIAS_ZONA), NZX, NZY)
+
+
+def resumo_tercos(contagens):
+    # Categoria x terço do campo (defensivo, meio, ataque)
+    return pd.DataFrame({terco: contagens[:, faixas, :].sum(axis=(1, 2)) for terco, faixas in TERCOS.items()},
+                        index=pd.Index(CATEGORIAS_ZONA, name="Categoria"))